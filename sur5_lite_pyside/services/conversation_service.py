@@ -33,6 +33,15 @@ from sur5_lite_pyside.services.dual_mode_utils import (
     apply_prompt_template
 )
 
+# Optional faster encoder for the per-token chunk payloads
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    _json_dumps = json.dumps
+
 
 class GenerationWorker(QObject):
     """Worker for running generation in QThread with proper signal handling"""
@@ -42,6 +51,10 @@ class GenerationWorker(QObject):
     generation_complete = Signal()
     generation_error = Signal(str)
     
+    # Consecutive delta chunks are joined and sent at most once per interval (~60 Hz);
+    # a held batch is flushed by a deadline timer if no further token arrives
+    _BATCH_INTERVAL_S = 0.016
+    
     def __init__(self, conversation_service, messages: List[Dict], context: str, thinking_mode: bool):
         super().__init__()
         self.conversation_service = conversation_service
@@ -49,11 +62,55 @@ class GenerationWorker(QObject):
         self.context = context
         self.thinking_mode = thinking_mode
         self._stop_flag = False
+        
+        # Pending delta batch, shared by the worker thread and the deadline timer
+        self._pending_lock = threading.Lock()
+        self._pending_kind = None
+        self._pending_parts: List[str] = []
+        self._last_emit = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
     
     def stop(self):
         """Signal the worker to stop"""
         self._stop_flag = True
     
+    def emit_chunk(self, kind: str, content: str, delta: bool, close: bool):
+        """Queue a chunk for the main thread, batching consecutive deltas of one kind"""
+        with self._pending_lock:
+            if delta and not close:
+                if self._pending_kind is not None and self._pending_kind != kind:
+                    self._flush_locked()
+                self._pending_kind = kind
+                self._pending_parts.append(content)
+                wait = self._BATCH_INTERVAL_S - (time.monotonic() - self._last_emit)
+                if wait <= 0:
+                    self._flush_locked()
+                elif self._flush_timer is None:
+                    # Held text must still show if the model stalls after this token
+                    self._flush_timer = threading.Timer(wait, self.flush_chunks)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+            # Non-delta/close chunks keep their order behind any pending text
+            self._flush_locked()
+            self.chunk_ready.emit(kind, content, delta, close)
+    
+    def flush_chunks(self):
+        """Emit the pending delta batch as a single chunk"""
+        with self._pending_lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        """flush_chunks body; caller holds _pending_lock"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._pending_parts:
+            self.chunk_ready.emit(self._pending_kind, "".join(self._pending_parts), True, False)
+            self._pending_parts.clear()
+        self._pending_kind = None
+        self._last_emit = time.monotonic()
+    
     @Slot()
     def run(self):
         """Run generation in QThread - this is thread-safe"""
@@ -71,10 +128,12 @@ class GenerationWorker(QObject):
                     self
                 )
             
+            self.flush_chunks()
             if not self._stop_flag:
                 self.generation_complete.emit()
                 
         except Exception as e:
+            self.flush_chunks()
             if not self._stop_flag:
                 self.generation_error.emit(str(e))
 
@@ -204,7 +263,7 @@ class ConversationService(QObject):
         }
         
         signal = self.thinking_chunk if kind == "thinking" else self.streaming_chunk
-        signal.emit(json.dumps(chunk_data))
+        signal.emit(_json_dumps(chunk_data))
         
         if close:
             logger.debug(f"{kind} closed uuid={self._current_message_uuid}")
@@ -217,7 +276,7 @@ class ConversationService(QObject):
         """Emit structured JSON chunk (thread-safe)."""
         # If called from worker thread, use worker's signal
         if self._worker and threading.current_thread() != threading.main_thread():
-            self._worker.chunk_ready.emit(kind, content, delta, close)
+            self._worker.emit_chunk(kind, content, delta, close)
         else:
             # Direct call from main thread (legacy path)
             self._handle_worker_chunk(kind, content, delta, close)
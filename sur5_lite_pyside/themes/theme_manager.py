@@ -747,6 +747,22 @@ class ThemeManager(QObject):
             outline: none;
         }}
         
+        /* Plain-text view used while a response streams */
+        QPlainTextEdit[class="message_content"] {{
+            background-color: transparent;
+            border: none;
+            padding: 4px;
+            color: {colors['text_primary']};
+        }}
+        
+        /* QLabel content in user message bubbles */
+        QLabel[class="message_content"] {{
+            background-color: transparent;
+            border: none;
+            padding: 4px;
+            color: {colors['text_primary']};
+        }}
+        
         /* Thinking bubble specific styling */
         QFrame[class="thinking_bubble"] {{
             background-color: rgba(88, 95, 161, 0.15);
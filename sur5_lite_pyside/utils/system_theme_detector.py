@@ -6,7 +6,7 @@ Detects OS dark/light mode preference to optionally auto-match Sur5's theme.
 Supports:
 - Windows: Registry AppsUseLightTheme
 - macOS: defaults read AppleInterfaceStyle
-- Linux/GNOME: gsettings color-scheme
+- Linux/GNOME: gsettings color-scheme (in-process via Gio when PyGObject is installed)
 - Linux/KDE: kdeglobals ColorScheme
 - Linux/XFCE: xfconf-query ThemeName
 - Fallback: GTK_THEME environment variable
@@ -17,9 +17,17 @@ Results are cached after first detection for minimal resource impact (~0.001% CP
 
 import os
 import platform
+import re
 from enum import Enum
 from typing import Optional
 
+# In-process gsettings access (avoids forking the gsettings binary)
+try:
+    from gi.repository import Gio
+    _HAS_GIO = True
+except (ImportError, ValueError):
+    _HAS_GIO = False
+
 
 class SystemTheme(Enum):
     """System theme preference."""
@@ -31,6 +39,29 @@ class SystemTheme(Enum):
 # Cached theme detection
 _system_theme_cache: Optional[SystemTheme] = None
 
+# Probe output classifiers: group 1 = dark, group 2 = light. The leading
+# ".*" alternation gives "dark" priority wherever it appears in the value.
+_THEME_RE = re.compile(r"(?is).*(dark)|.*(light)")
+_GNOME_SCHEME_RE = re.compile(r"(?is).*(dark)|.*(light|default)")
+_KDE_SCHEME_RE = re.compile(r"(?is).*(dark)|.*(light|breeze)")
+
+# Per-probe subprocess timeout; healthy gsettings/kreadconfig calls finish in <50ms
+_PROBE_TIMEOUT_S = 0.3
+
+# Minimal environment shared by every probe (built once, not copied per fork).
+# Keeps what gsettings/dconf/kreadconfig/xfconf need to find the session.
+_PROBE_ENV = {
+    key: os.environ[key]
+    for key in (
+        "PATH", "HOME", "USER", "LANG",
+        "DISPLAY", "WAYLAND_DISPLAY", "DBUS_SESSION_BUS_ADDRESS",
+        "XDG_RUNTIME_DIR", "XDG_CONFIG_HOME", "XDG_CONFIG_DIRS",
+        "XDG_DATA_HOME", "XDG_DATA_DIRS",
+        "GSETTINGS_BACKEND", "GSETTINGS_SCHEMA_DIR",
+    )
+    if key in os.environ
+}
+
 
 def get_system_theme() -> SystemTheme:
     """Detect the system's preferred color scheme (dark/light mode).
@@ -176,131 +207,151 @@ def _detect_theme_macos() -> SystemTheme:
 # Linux Theme Detection
 # =============================================================================
 
-def _detect_theme_linux() -> SystemTheme:
-    """Detect Linux system theme.
+def _run_probe(cmd: list) -> Optional[str]:
+    """Run a theme probe command.
     
-    Checks in order: GNOME -> KDE -> XFCE -> GTK_THEME env var
+    Returns:
+        stdout on success, None on missing binary, timeout, or non-zero exit
     """
     import subprocess
-    
-    # 1. GNOME: Check color-scheme setting
     try:
         result = subprocess.run(
-            ["gsettings", "get", "org.gnome.desktop.interface", "color-scheme"],
-            capture_output=True, text=True, timeout=2
+            cmd, capture_output=True,
+            timeout=_PROBE_TIMEOUT_S, env=_PROBE_ENV
         )
-        if result.returncode == 0:
-            scheme = result.stdout.strip().strip("'\"").lower()
-            if "dark" in scheme:
-                return SystemTheme.DARK
-            elif "light" in scheme or "default" in scheme:
-                return SystemTheme.LIGHT
-    except Exception:
-        pass
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    # Probe output is plain ASCII; skip locale-aware text decoding
+    return result.stdout.decode("ascii", "ignore")
+
+
+def _classify(raw: Optional[str], pattern: re.Pattern = _THEME_RE) -> SystemTheme:
+    """Classify a probe's raw output as dark/light in a single regex pass."""
+    if not raw:
+        return SystemTheme.UNKNOWN
+    match = pattern.match(raw)
+    if match is None:
+        return SystemTheme.UNKNOWN
+    return SystemTheme.DARK if match.group(1) else SystemTheme.LIGHT
+
+
+def gsettings_get(schema: str, key: str) -> Optional[str]:
+    """Read a gsettings key as the gsettings CLI prints it, unquoted.
     
-    # 2. GNOME fallback: Check gtk-theme for dark indicators
-    try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.gnome.desktop.interface", "gtk-theme"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            theme = result.stdout.strip().strip("'\"").lower()
-            if "dark" in theme:
-                return SystemTheme.DARK
-            elif "light" in theme:
-                return SystemTheme.LIGHT
-    except Exception:
-        pass
+    Uses Gio in-process when PyGObject is available, otherwise shells out
+    to the gsettings binary. Boolean keys read as "true"/"false".
     
-    # 3. KDE Plasma: Check color scheme
-    for kread_cmd in ["kreadconfig6", "kreadconfig5"]:
+    Returns:
+        Unquoted value, or None if the schema/key is unavailable
+    """
+    if _HAS_GIO:
         try:
-            result = subprocess.run(
-                [kread_cmd, "--file", "kdeglobals", "--group", "General", 
-                 "--key", "ColorScheme"],
-                capture_output=True, text=True, timeout=2
-            )
-            if result.returncode == 0:
-                scheme = result.stdout.strip().lower()
-                if scheme:
-                    if "dark" in scheme or "breeze-dark" in scheme:
-                        return SystemTheme.DARK
-                    elif "light" in scheme or "breeze" in scheme:
-                        return SystemTheme.LIGHT
+            # Gio.Settings.new() aborts the process on unknown schemas
+            source = Gio.SettingsSchemaSource.get_default()
+            schema_obj = source.lookup(schema, True) if source else None
+            if schema_obj is None or not schema_obj.has_key(key):
+                return None
+            value = Gio.Settings.new(schema).get_value(key).unpack()
+            if isinstance(value, bool):
+                return "true" if value else "false"
+            return str(value)
         except Exception:
-            pass
+            return None
     
-    # 4. XFCE: Check theme name
-    try:
-        result = subprocess.run(
-            ["xfconf-query", "-c", "xsettings", "-p", "/Net/ThemeName"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            theme = result.stdout.strip().lower()
-            if "dark" in theme:
-                return SystemTheme.DARK
-            elif "light" in theme:
-                return SystemTheme.LIGHT
-    except Exception:
-        pass
+    output = _run_probe(["gsettings", "get", schema, key])
+    if output is None:
+        return None
+    return output.strip().strip("'\"")
+
+
+def _probe_gnome() -> SystemTheme:
+    """GNOME: color-scheme, then gtk-theme for dark indicators."""
+    result = _classify(
+        gsettings_get("org.gnome.desktop.interface", "color-scheme"),
+        _GNOME_SCHEME_RE,
+    )
+    if result is not SystemTheme.UNKNOWN:
+        return result
     
-    # 5. Cinnamon: Check gtk-theme
-    try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.cinnamon.desktop.interface", "gtk-theme"],
-            capture_output=True, text=True, timeout=2
+    # Read gtk-theme once; covers both the Adwaita defaults and dark/light names
+    theme = gsettings_get("org.gnome.desktop.interface", "gtk-theme")
+    if theme == "Adwaita":
+        return SystemTheme.LIGHT  # Adwaita-dark is caught by _classify
+    return _classify(theme)
+
+
+def _probe_kde() -> SystemTheme:
+    """KDE Plasma: kdeglobals ColorScheme."""
+    for kread_cmd in ["kreadconfig6", "kreadconfig5"]:
+        output = _run_probe(
+            [kread_cmd, "--file", "kdeglobals", "--group", "General", 
+             "--key", "ColorScheme"]
         )
-        if result.returncode == 0:
-            theme = result.stdout.strip().strip("'\"").lower()
-            if "dark" in theme:
-                return SystemTheme.DARK
-            elif "light" in theme:
-                return SystemTheme.LIGHT
-    except Exception:
-        pass
+        result = _classify(output, _KDE_SCHEME_RE)
+        if result is not SystemTheme.UNKNOWN:
+            return result
     
-    # 6. MATE: Check gtk-theme
-    try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.mate.interface", "gtk-theme"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            theme = result.stdout.strip().strip("'\"").lower()
-            if "dark" in theme:
-                return SystemTheme.DARK
-            elif "light" in theme:
-                return SystemTheme.LIGHT
-    except Exception:
-        pass
+    return SystemTheme.UNKNOWN
+
+
+def _probe_xfce() -> SystemTheme:
+    """XFCE: xsettings ThemeName."""
+    return _classify(_run_probe(["xfconf-query", "-c", "xsettings", "-p", "/Net/ThemeName"]))
+
+
+def _probe_cinnamon() -> SystemTheme:
+    """Cinnamon: gtk-theme."""
+    return _classify(gsettings_get("org.cinnamon.desktop.interface", "gtk-theme"))
+
+
+def _probe_mate() -> SystemTheme:
+    """MATE: gtk-theme."""
+    return _classify(gsettings_get("org.mate.interface", "gtk-theme"))
+
+
+# XDG_CURRENT_DESKTOP token (lowercased) -> probe for that desktop
+_DESKTOP_PROBES = {
+    "gnome": _probe_gnome,
+    "kde": _probe_kde,
+    "xfce": _probe_xfce,
+    "x-cinnamon": _probe_cinnamon,
+    "mate": _probe_mate,
+}
+
+# Full ladder order, used when the desktop is unknown or in strict mode
+_PROBE_LADDER = (_probe_gnome, _probe_kde, _probe_xfce, _probe_cinnamon, _probe_mate)
+
+
+def _detect_theme_linux(strict: bool = False) -> SystemTheme:
+    """Detect Linux system theme.
     
-    # 7. GTK_THEME environment variable (fallback)
-    gtk_theme = os.environ.get("GTK_THEME", "").lower()
-    if gtk_theme:
-        if "dark" in gtk_theme:
-            return SystemTheme.DARK
-        elif "light" in gtk_theme:
-            return SystemTheme.LIGHT
+    Only the probe matching XDG_CURRENT_DESKTOP is run, so a KDE session
+    never forks GNOME tooling. If the desktop is unrecognised (or strict is
+    set), every probe is tried in order: GNOME -> KDE -> XFCE -> Cinnamon ->
+    MATE. Falls back to the GTK_THEME environment variable afterwards.
     
-    # 8. Check Adwaita variants (common default)
-    try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.gnome.desktop.interface", "gtk-theme"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            theme = result.stdout.strip().strip("'\"")
-            # Adwaita-dark is dark, plain Adwaita is light
-            if theme == "Adwaita-dark":
-                return SystemTheme.DARK
-            elif theme == "Adwaita":
-                return SystemTheme.LIGHT
-    except Exception:
-        pass
+    Args:
+        strict: Run the full multi-probe ladder regardless of desktop
+    """
+    probes = _PROBE_LADDER
+    if not strict:
+        # e.g. "ubuntu:GNOME", "KDE", "X-Cinnamon"
+        desktops = os.environ.get("XDG_CURRENT_DESKTOP", "").lower().split(":")
+        for desktop in desktops:
+            probe = _DESKTOP_PROBES.get(desktop)
+            if probe is not None:
+                probes = (probe,)
+                break
     
-    return SystemTheme.UNKNOWN
+    for probe in probes:
+        theme = probe()
+        if theme is not SystemTheme.UNKNOWN:
+            return theme
+    
+    # GTK_THEME environment variable (fallback)
+    return _classify(os.environ.get("GTK_THEME"))
 
 
 def get_theme_info() -> dict:
@@ -309,11 +360,13 @@ def get_theme_info() -> dict:
     Returns:
         Dictionary with theme details for debugging
     """
+    # Detect once and derive the flags from the same result
+    theme = get_system_theme()
     return {
         "platform": platform.system(),
-        "detected_theme": get_system_theme().value,
-        "is_dark_mode": is_dark_mode(),
-        "is_light_mode": is_light_mode(),
+        "detected_theme": theme.value,
+        "is_dark_mode": theme == SystemTheme.DARK,
+        "is_light_mode": theme == SystemTheme.LIGHT,
         "recommended_sur5_theme": get_recommended_sur5_theme(),
         "gtk_theme_env": os.environ.get("GTK_THEME", ""),
         "xdg_current_desktop": os.environ.get("XDG_CURRENT_DESKTOP", ""),
@@ -337,6 +390,7 @@ def print_theme_info() -> None:
         print(f"\nLinux Details:")
         print(f"  GTK_THEME:           {info['gtk_theme_env'] or '(not set)'}")
         print(f"  XDG_CURRENT_DESKTOP: {info['xdg_current_desktop'] or '(not set)'}")
+        print(f"  Full Probe Ladder:   {_detect_theme_linux(strict=True).value}")
     
     print("=" * 50 + "\n")
 
@@ -8,7 +8,7 @@ Licensed under MIT License
 https://sur5ve.com
 """
 
-from typing import Optional, Dict, Any
+from typing import Dict, Any
 import json
 import time
 
@@ -19,16 +19,40 @@ from PySide6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QSplitter,
     QFrame, QLabel, QScrollArea, QGroupBox
 )
-from PySide6.QtCore import Qt, Slot
+from PySide6.QtCore import Qt, Slot, QTimer
 
 from services.conversation_service import ConversationService
 from services.model_service import ModelService
+from services.dual_mode_utils import get_model_capabilities
 
 from .thread_view import ChatThreadView
 from .composer import MessageComposer
 from widgets.sidebar.model_panel import ModelPanel
 from widgets.common.control_hub_tab import ControlHubTab
 
+# Optional faster decoder for the per-token chunk path
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+
+def _parse_chunk(chunk: str) -> Dict[str, Any]:
+    """Parse a streaming chunk payload once for all consumers.
+    
+    Non-JSON payloads are treated as raw content with no close flag.
+    """
+    # Plain-text chunks skip the decoder and its exception round-trip
+    if chunk.lstrip()[:1] != "{" or chunk.rstrip()[-1:] != "}":
+        return {"content": chunk, "close": False}
+    try:
+        return _json_loads(chunk)
+    except _JSONDecodeError:
+        return {"content": chunk, "close": False}
+
 
 class ChatContainer(QWidget):
     """Main chat interface container"""
@@ -45,15 +69,30 @@ class ChatContainer(QWidget):
         self.conversation_service = conversation_service
         self.model_service = model_service
         
-        # refs
-        self.thread_view: Optional[ChatThreadView] = None
-        self.composer: Optional[MessageComposer] = None
-        self.sidebar: Optional[QWidget] = None
-        self.control_hub_tab: Optional[ControlHubTab] = None
-        self.main_splitter: Optional[QSplitter] = None
+        # refs (assigned by _setup_ui, never None afterwards)
+        self.thread_view: ChatThreadView
+        self.composer: MessageComposer
+        self.sidebar: QWidget
+        self.control_hub_tab: ControlHubTab
+        self.main_splitter: QSplitter
+        
+        # Sidebar state cached here so toggling/resizing never asks the
+        # splitter for a fresh sizes() list
+        self._sidebar_collapsed = True
+        self._preferred_sidebar_px = 420
+        
+        # model_path -> capabilities, cleared when a model is (re)loaded
+        self._capabilities_cache: Dict[str, Dict[str, Any]] = {}
+        
+        # Coalesce resize bursts (window drags) into one reposition per frame
+        self._reposition_timer = QTimer(self)
+        self._reposition_timer.setSingleShot(True)
+        self._reposition_timer.setInterval(16)
+        self._reposition_timer.timeout.connect(self._reposition_control_hub)
         
         # ui
         self._setup_ui()
+        assert self.thread_view is not None and self.composer is not None and self.main_splitter is not None
         self._connect_signals()
         
     def _setup_ui(self):
@@ -90,6 +129,9 @@ class ChatContainer(QWidget):
         
         main_layout.addWidget(self.main_splitter)
         
+        # Remember user drags of the splitter handle
+        self.main_splitter.splitterMoved.connect(self._on_splitter_moved)
+        
         # Create Control Hub Tab (overlay on sidebar)
         self.control_hub_tab = ControlHubTab(parent=self)
         self.control_hub_tab.clicked.connect(self._toggle_sidebar)
@@ -141,34 +183,41 @@ class ChatContainer(QWidget):
         
     def _connect_signals(self):
         """Connect signals between components and services"""
-        # Composer to conversation service
-        if self.composer:
-            self.composer.message_sent.connect(self._on_message_sent)
-            
-        # Conversation service to UI components
-        self.conversation_service.message_received.connect(self.on_message_received)
-        self.conversation_service.thinking_started.connect(self.on_thinking_started)
-        self.conversation_service.response_started.connect(self.on_response_started)
-        self.conversation_service.thinking_chunk.connect(self.on_thinking_chunk)
-        self.conversation_service.streaming_chunk.connect(self.on_streaming_chunk)
-        self.conversation_service.error_occurred.connect(self.on_conversation_error)
-        
-        # Model service to UI components
-        self.model_service.model_loaded.connect(self.on_model_loaded)
-        self.model_service.model_error.connect(self.on_model_error)
-        self.model_service.generation_started.connect(self.on_generation_started)
-        self.model_service.generation_finished.connect(self.on_generation_finished)
+        auto = Qt.ConnectionType.AutoConnection
+        # Chunk signals fire per token and are always emitted on the GUI thread
+        # (ConversationService re-emits worker chunks from its own slot), so
+        # skip the connection-type thread check on the hot path.
+        direct = Qt.ConnectionType.DirectConnection
+        
+        connections = (
+            # Composer to conversation service
+            (self.composer.message_sent, self._on_message_sent, auto),
+            # Conversation service to UI components
+            (self.conversation_service.message_received, self.on_message_received, auto),
+            (self.conversation_service.thinking_started, self.on_thinking_started, auto),
+            (self.conversation_service.response_started, self.on_response_started, auto),
+            (self.conversation_service.thinking_chunk, self.on_thinking_chunk, direct),
+            (self.conversation_service.streaming_chunk, self.on_streaming_chunk, direct),
+            (self.conversation_service.error_occurred, self.on_conversation_error, auto),
+            # Model service to UI components
+            (self.model_service.model_loaded, self.on_model_loaded, auto),
+            (self.model_service.model_error, self.on_model_error, auto),
+            (self.model_service.generation_started, self.on_generation_started, auto),
+            (self.model_service.generation_finished, self.on_generation_finished, auto),
+        )
+        for signal, slot, conn_type in connections:
+            signal.connect(slot, conn_type)
         
     def _on_message_sent(self, message: str):
         """Handle message sent from composer"""
-        if message.strip():
+        # Composer emits stripped text, so only the empty case needs checking
+        if message:
             # Get thinking mode preference
             use_thinking = self.model_service.get_thinking_mode()
             
             # Force standard mode for models that don't support thinking
-            from sur5_lite_pyside.services.dual_mode_utils import get_model_capabilities
             if self.model_service.current_model_path:
-                caps = get_model_capabilities(self.model_service.current_model_path)
+                caps = self._get_model_capabilities(self.model_service.current_model_path)
                 if not caps.get("supports_thinking", False):
                     use_thinking = False
             
@@ -177,19 +226,22 @@ class ChatContainer(QWidget):
             
             if success:
                 # Clear composer
-                if self.composer:
-                    self.composer.clear()
+                self.composer.clear()
             else:
                 # Re-enable composer if send failed
-                if self.composer:
-                    self.composer.set_sending_state(False)
+                self.composer.set_sending_state(False)
+                    
+    def _get_model_capabilities(self, model_path: str) -> Dict[str, Any]:
+        """Get model capabilities, cached per model path"""
+        caps = self._capabilities_cache.get(model_path)
+        if caps is None:
+            caps = get_model_capabilities(model_path)
+            self._capabilities_cache[model_path] = caps
+        return caps
                     
     @Slot(dict)
     def on_message_received(self, message_data: Dict[str, Any]):
         """Handle new message received"""
-        if not self.thread_view:
-            return
-        
         # Check if this is for an active streaming session
         if message_data.get("role") == "assistant" and self.thread_view.current_message_unit:
             logger.debug("Finalizing persistent MessageUnit with backend content")
@@ -215,107 +267,86 @@ class ChatContainer(QWidget):
     @Slot()
     def on_thinking_started(self):
         """Handle thinking mode started"""
-        if self.thread_view:
-            self.thread_view.start_thinking_mode()
+        self.thread_view.start_thinking_mode()
     
     @Slot()
     def on_response_started(self):
         """Handle standard response mode started (no thinking phase)"""
-        if self.thread_view:
-            # Guard: Only create MessageUnit if one doesn't already exist (prevents duplicates)
-            if not self.thread_view.current_message_unit:
-                self.thread_view.start_response_mode()
+        # Guard: Only create MessageUnit if one doesn't already exist (prevents duplicates)
+        if not self.thread_view.current_message_unit:
+            self.thread_view.start_response_mode()
             
     @Slot(str)
     def on_thinking_chunk(self, thinking_chunk: str):
         """Handle thinking chunk (now includes close handling)"""
-        if not self.thread_view:
-            return
-        
-        # Parse chunk to detect close signal
-        try:
-            chunk_data = json.loads(thinking_chunk)
-        except json.JSONDecodeError:
-            chunk_data = {"close": False}
+        # Parse once; thread view consumes the dict directly
+        chunk_data = _parse_chunk(thinking_chunk)
         
         # Route to thread view
-        self.thread_view.update_thinking_content(thinking_chunk)
+        self.thread_view.update_thinking_content(chunk_data)
         
         # Thinking close doesn't re-enable composer (wait for response close)
             
     @Slot(str)
     def on_streaming_chunk(self, response_chunk: str):
         """Handle streaming response chunk (now includes close handling)"""
-        if not self.thread_view:
-            return
-        
-        # Parse chunk to detect close signal
-        try:
-            chunk_data = json.loads(response_chunk)
-        except json.JSONDecodeError:
-            chunk_data = {"close": False}
+        # Parse once; thread view consumes the dict directly
+        chunk_data = _parse_chunk(response_chunk)
         
         # Route to thread view for processing
-        self.thread_view.update_streaming_response(response_chunk)
+        self.thread_view.update_streaming_response(chunk_data)
         
         # Handle close signal: re-enable composer
         if chunk_data.get("close"):
             logger.debug("Stream closed, re-enabling composer")
-            if self.composer:
-                self.composer.set_sending_state(False)
-                self.composer.focus_input()
+            self.composer.set_sending_state(False)
+            self.composer.focus_input()
             
     @Slot(str)
     def on_conversation_error(self, error_message: str):
         """Handle conversation error"""
-        if self.thread_view:
-            # Reset streaming state if error occurred during streaming
-            if self.thread_view.is_streaming:
-                self.thread_view.finish_response()
-            self.thread_view.show_error(error_message)
+        # Reset streaming state if error occurred during streaming
+        if self.thread_view.is_streaming:
+            self.thread_view.finish_response()
+        self.thread_view.show_error(error_message)
             
         # Re-enable composer
-        if self.composer:
-            self.composer.set_sending_state(False)
+        self.composer.set_sending_state(False)
             
     @Slot(str, str)
     def on_model_loaded(self, model_name: str, model_path: str):
         """Handle model loaded event"""
+        # Model files may have been swapped on disk; re-probe on next send
+        self._capabilities_cache.clear()
+        
         # Enable composer if model is loaded
-        if self.composer:
-            self.composer.set_model_available(True)
+        self.composer.set_model_available(True)
             
         # Update thread view to show model status at the top
-        if self.thread_view:
-            self.thread_view.show_status_message(f"Sur ready: {model_name} loaded", is_model_status=True)
+        self.thread_view.show_status_message(f"Sur ready: {model_name} loaded", is_model_status=True)
             
     @Slot(str)
     def on_model_error(self, error_message: str):
         """Handle model error"""
         # Disable composer if model error
-        if self.composer:
-            self.composer.set_model_available(False)
+        self.composer.set_model_available(False)
             
         # Show error in thread view
-        if self.thread_view:
-            self.thread_view.show_error(f"Model error: {error_message}")
+        self.thread_view.show_error(f"Model error: {error_message}")
             
     @Slot()
     def on_generation_started(self):
         """Handle generation started"""
-        if self.composer:
-            self.composer.set_sending_state(True)
+        self.composer.set_sending_state(True)
             
     @Slot()
     def on_generation_finished(self):
         """Handle generation finished"""
-        if self.composer:
-            self.composer.set_sending_state(False)
+        self.composer.set_sending_state(False)
             
     def clear_chat(self):
         """Clear the chat thread view"""
-        if self.thread_view:
-            self.thread_view.clear_messages()
+        self.thread_view.clear_messages()
             
     def get_chat_history(self):
         """Get the current chat history"""
@@ -331,43 +362,58 @@ class ChatContainer(QWidget):
         
     def focus_composer(self):
         """Focus the message composer input"""
-        if self.composer:
-            self.composer.focus_input()
+        self.composer.focus_input()
     
     def _toggle_sidebar(self):
         """Toggle sidebar visibility"""
-        if not self.main_splitter:
-            return
-            
-        sizes = self.main_splitter.sizes()
-        if sizes[1] == 0:  # Sidebar is collapsed
-            # Expand sidebar to 420px
-            new_sidebar_size = 420
-            new_chat_size = max(sizes[0] - new_sidebar_size, 100)
-            self.main_splitter.setSizes([new_chat_size, new_sidebar_size])
-        else:  # Sidebar is visible
+        total = self.main_splitter.width()
+        if self._sidebar_collapsed:
+            # Expand sidebar to the last user-chosen width (420px by default)
+            sidebar_px = self._preferred_sidebar_px
+            self.main_splitter.setSizes([max(total - sidebar_px, 100), sidebar_px])
+        else:
             # Collapse sidebar
-            self.main_splitter.setSizes([sizes[0] + sizes[1], 0])
+            self.main_splitter.setSizes([total, 0])
+        self._sidebar_collapsed = not self._sidebar_collapsed
+        
+        self.control_hub_tab.raise_()  # Keep on top of the resized sidebar
+    
+    def _on_splitter_moved(self, pos: int, index: int):
+        """Track sidebar state when the user drags the splitter handle"""
+        sidebar_px = self.sidebar.width()
+        self._sidebar_collapsed = sidebar_px == 0
+        if sidebar_px:
+            self._preferred_sidebar_px = sidebar_px
+    
+    def showEvent(self, event):
+        """Position and raise the Control Hub Tab when first shown"""
+        super().showEvent(event)
+        # Sizes may have been restored from settings before show; sync once
+        sizes = self.main_splitter.sizes()
+        self._sidebar_collapsed = len(sizes) < 2 or sizes[1] == 0
+        if not self._sidebar_collapsed:
+            self._preferred_sidebar_px = sizes[1]
+        
+        self._reposition_control_hub()
+        self.control_hub_tab.raise_()
     
     def resizeEvent(self, event):
-        """Handle resize to position Control Hub Tab"""
+        """Handle resize to position Control Hub Tab (coalesced per frame)"""
         super().resizeEvent(event)
+        if not self._reposition_timer.isActive():
+            self._reposition_timer.start()
+    
+    def _reposition_control_hub(self):
+        """Move the Control Hub Tab to the right edge of the window"""
+        # Position the Control Hub Tab at the right edge of the window
+        # It should be visible even when sidebar is collapsed
+        splitter_geo = self.main_splitter.geometry()
         
-        if self.control_hub_tab and self.main_splitter:
-            # Position the Control Hub Tab at the right edge of the window
-            # It should be visible even when sidebar is collapsed
-            splitter_geo = self.main_splitter.geometry()
-            
-            # Get the position where the sidebar would start
-            sizes = self.main_splitter.sizes()
-            chat_width = sizes[0] if len(sizes) > 0 else 0
-            
-            # Position the tab at the right edge (works for both collapsed and expanded)
-            tab_x = splitter_geo.x() + self.width() - self.control_hub_tab.width() - 8
-            tab_y = splitter_geo.y() + 100  # Offset from top
-            
-            self.control_hub_tab.move(tab_x, tab_y)
-            self.control_hub_tab.raise_()  # Ensure it stays on top
+        # Position the tab at the right edge (works for both collapsed and expanded)
+        tab_x = splitter_geo.x() + self.width() - self.control_hub_tab.width() - 8
+        tab_y = splitter_geo.y() + 100  # Offset from top
+        
+        self.control_hub_tab.move(tab_x, tab_y)
     
     def closeEvent(self, event):
         """Clean up thread before closing"""
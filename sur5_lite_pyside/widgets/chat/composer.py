@@ -18,7 +18,7 @@ class MessageComposer(QWidget):
     """Message input and send controls"""
     
     # Signals
-    message_sent = Signal(str)  # message_content
+    message_sent = Signal(str)  # message_content (already stripped, never empty)
     
     def __init__(self, parent=None):
         super().__init__(parent)
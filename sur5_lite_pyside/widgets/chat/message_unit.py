@@ -11,26 +11,64 @@ from PySide6.QtWidgets import (
     QPushButton,
     QFrame,
     QTextBrowser,
+    QPlainTextEdit,
     QSizePolicy,
     QGraphicsOpacityEffect,
     QMenu,
 )
 from PySide6.QtCore import Qt, Signal, QTimer, QPropertyAnimation, QEasingCurve, Property
-from PySide6.QtGui import QGuiApplication, QColor, QFont, QCursor
+from PySide6.QtGui import QGuiApplication, QColor, QFont, QPalette, QTextCursor
 import time
 import logging
-from typing import Dict
+from collections import OrderedDict
+from enum import IntEnum
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Tuple
 
 from .collapsible_frame import CollapsibleFrame
 
 logger = logging.getLogger(__name__)
 
+# Rendered HTML keyed by markdown text plus the font and palette colors that
+# toHtml() bakes in, so a theme or font-size change never replays stale
+# styling; replaying history with setHtml skips Qt's markdown tokenizer.
+# LRU-bounded so long sessions don't grow it forever.
+_RENDER_CACHE: "OrderedDict[Tuple[str, str, int, int], str]" = OrderedDict()
+_RENDER_CACHE_MAX = 256
+
+
+@lru_cache(maxsize=256)
+def _fmt_hhmm(minute_bucket: int) -> str:
+    """Local "HH:MM" for a minute bucket (int(timestamp) // 60).
+
+    Bounded to the most recent ~256 distinct minutes, which covers a
+    history reload plus live streaming without growing for the session.
+    """
+    # format fields directly; strftime goes through the locale machinery
+    lt = time.localtime(minute_bucket * 60)
+    return f"{lt.tm_hour:02d}:{lt.tm_min:02d}"
+
+
+class StreamingPhase(IntEnum):
+    """MessageUnit streaming state (ordered; SKELETON..RESPONSE accept response chunks)."""
+    NONE = 0
+    THINKING = 1
+    SKELETON = 2
+    RESPONSE = 3
+    FINAL = 4
+
 
 class MessageUnit(QWidget):
     """Static message bubble with copy button and collapsible thinking"""
 
     copy_requested = Signal(str)
 
+    # Shared across all bubbles; built once by _init_shared_resources()
+    _SUR_FONT = None
+    _USER_PALETTE = None
+    _ASSISTANT_PALETTE = None
+    _TS_STYLE = "color: rgba(230, 230, 230, 0.95); font-size: 10px; font-weight: 500;"
+
     def __init__(
         self,
         role: str,
@@ -47,18 +85,23 @@ class MessageUnit(QWidget):
         self.thinking_content = thinking_content
         self.elapsed_ms = elapsed_ms
         self.collapsible_frame = None
+        self._thinking_built = False  # thinking browser is built on first expand
+        self._label_cache: Optional[List[QLabel]] = None  # see labels()
 
         # Streaming state
         self.is_streaming = False
-        self.streaming_phase = None  # "thinking", "skeleton", "final"
+        self.streaming_phase = StreamingPhase.NONE
         self._thinking_buffer = ""
         self._response_buffer = ""
 
+        self._last_flushed_len = 0  # chars of _response_buffer already in the streaming view
+
         # Streaming widgets (created on demand)
         self._processing_header = None
         self._skeleton_loader = None
         self._progress_label = None
         self._thinking_browser_streaming = None  # Different from final collapsible
+        self._streaming_view = None  # Plain-text response view, replaced by content_browser on finalize
         self._response_progress = None
 
         # Animation references (prevent garbage collection)
@@ -79,13 +122,50 @@ class MessageUnit(QWidget):
         self._typing_timer = None
         self._typing_dots = 0
 
+        # Copy context menu (created lazily on first right-click)
+        self._copy_menu = None
+        self._copy_with_thinking_action = None
+
+        # Last document height applied by _adjust_height (-1 = never)
+        self._last_doc_height = -1
+        self._size_signal_connected = False
+        self._height_pending = False  # deferred _adjust_height already queued
+
+        # Offscreen virtualization: the rendered document is dropped after the
+        # bubble has been scrolled away for a while and rebuilt from self.content
+        self._detached = False
+        self._detach_timer = None
+
+        if MessageUnit._SUR_FONT is None:
+            self._init_shared_resources()
+
         self._init_ui()
 
+    @staticmethod
+    def _init_shared_resources():
+        """Build the font and row palettes shared by every MessageUnit
+
+        The palettes only resolve the Window role, so every other role is
+        still inherited from the parent and Qt shares one palette per role.
+        """
+        MessageUnit._SUR_FONT = QFont("Segoe UI", 10, QFont.Weight.Bold)
+
+        # User messages: slightly lighter background (bg_secondary)
+        user_palette = QPalette()
+        user_palette.setColor(QPalette.ColorRole.Window, QColor("#1a1a1a"))
+        MessageUnit._USER_PALETTE = user_palette
+
+        # Assistant messages: match main chat background (bg_primary)
+        assistant_palette = QPalette()
+        assistant_palette.setColor(QPalette.ColorRole.Window, QColor("#0d0d0d"))
+        MessageUnit._ASSISTANT_PALETTE = assistant_palette
+
     def _create_thinking_browser(self) -> QTextBrowser:
         """Create and configure a thinking content browser"""
         thinking_browser = QTextBrowser()
         thinking_browser.setReadOnly(True)
         thinking_browser.setFrameShape(QFrame.Shape.NoFrame)
+        thinking_browser.setOpenLinks(False)
         thinking_browser.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         thinking_browser.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         thinking_browser.setLineWrapMode(QTextBrowser.LineWrapMode.WidgetWidth)
@@ -97,26 +177,104 @@ class MessageUnit(QWidget):
         
         # Connect size adjustment
         thinking_browser.document().documentLayout().documentSizeChanged.connect(
-            lambda: self._adjust_browser_height(thinking_browser)
+            partial(self._adjust_browser_height, thinking_browser)
         )
         
         return thinking_browser
 
+    def _create_collapsible_thinking(self) -> CollapsibleFrame:
+        """Create the collapsed reasoning section (browser deferred to first expand)"""
+        frame = CollapsibleFrame("Model reasoning - click to expand")
+        frame.collapse()  # Default collapsed
+        frame.toggled.connect(self._on_thinking_toggled)
+        return frame
+
+    def _on_thinking_toggled(self, expanded: bool):
+        """Build and populate the thinking browser the first time it is shown"""
+        if not expanded or self._thinking_built or not self.collapsible_frame:
+            return
+        self._thinking_built = True
+        thinking_browser = self._create_thinking_browser()
+        thinking_browser.setPlainText(self.thinking_content)
+        self.collapsible_frame.set_content(thinking_browser)
+
+    def _create_content_browser(self) -> QTextBrowser:
+        """Create the markdown content browser used by assistant messages"""
+        # Main content browser - dynamically expands to fit ALL content
+        self.content_browser = QTextBrowser()
+        self.content_browser.setReadOnly(True)
+        self.content_browser.setFrameShape(QFrame.Shape.NoFrame)
+        self.content_browser.setOpenExternalLinks(False)
+        self.content_browser.setOpenLinks(False)  # no anchor navigation; selection only
+        self.content_browser.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.content_browser.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.content_browser.setLineWrapMode(QTextBrowser.LineWrapMode.WidgetWidth)  # Ensure word wrapping
+        self.content_browser.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.content_browser.setProperty("class", "message_content")
+        self.content_browser.setSizeAdjustPolicy(QTextBrowser.SizeAdjustPolicy.AdjustToContents)
+        
+        # size policy for vertical expansion
+        self.content_browser.setSizePolicy(
+            QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum
+        )
+        
+        # Connect document size changes to trigger height adjustment
+        self._set_size_tracking(True)
+        
+        self.content_browser.setMinimumHeight(30)
+        
+        return self.content_browser
+
+    def _create_streaming_view(self) -> QPlainTextEdit:
+        """Create the plain-text view used while a response streams in.
+
+        QPlainTextEdit's line-based layout makes appends O(appended text);
+        the markdown browser is only populated once on finalize.
+        """
+        view = QPlainTextEdit()
+        view.setReadOnly(True)
+        view.setFrameShape(QFrame.Shape.NoFrame)
+        view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        view.setLineWrapMode(QPlainTextEdit.LineWrapMode.WidgetWidth)
+        view.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        view.setProperty("class", "message_content")
+        view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+        view.setMinimumHeight(30)
+        view.hide()
+
+        # Plain-text layout reports size in lines; convert to pixels on change
+        view.document().documentLayout().documentSizeChanged.connect(
+            self._adjust_streaming_height
+        )
+
+        # Sit where the (hidden) markdown browser will appear
+        layout = self.bubble_frame.layout()
+        layout.insertWidget(layout.indexOf(self.content_browser), view)
+        return view
+
+    def _adjust_streaming_height(self, new_size=None):
+        """Grow the streaming view to fit its wrapped lines"""
+        view = self._streaming_view
+        if view is None:
+            return
+        line_count = view.document().documentLayout().documentSize().height()
+        target_height = max(int(line_count * view.fontMetrics().lineSpacing()) + 20, 30)
+        if target_height != view.minimumHeight():
+            view.setMinimumHeight(target_height)
+            view.updateGeometry()
+
     def _init_ui(self):
         """Initialize UI - SIMPLIFIED AND WORKING"""
-        main_layout = QHBoxLayout(self)
+        main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(8, 4, 8, 4)
 
         # Set full-width row background based on role
         self.setAutoFillBackground(True)
-        palette = self.palette()
         if self.role == "user":
-            # User messages: slightly lighter background
-            palette.setColor(self.backgroundRole(), QColor("#1a1a1a"))  # bg_secondary
+            self.setPalette(MessageUnit._USER_PALETTE)
         else:  # assistant
-            # Assistant messages: match main chat background
-            palette.setColor(self.backgroundRole(), QColor("#0d0d0d"))  # bg_primary
-        self.setPalette(palette)
+            self.setPalette(MessageUnit._ASSISTANT_PALETTE)
         
         # prevent WA_StyledBackground scroll paint bug
         # Do NOT set WA_StyledBackground on MessageUnit - use palette only
@@ -137,8 +295,7 @@ class MessageUnit(QWidget):
             
             sur_label = QLabel("Sur")
             sur_label.setProperty("class", "sur_branding")
-            sur_font = QFont("Segoe UI", 10, QFont.Weight.Bold)
-            sur_label.setFont(sur_font)
+            sur_label.setFont(MessageUnit._SUR_FONT)
             
             # prevent paint invalidation
             sur_label.setAutoFillBackground(False)
@@ -151,52 +308,37 @@ class MessageUnit(QWidget):
 
         # Add collapsible thinking section if thinking content present
         if self.thinking_content:
-            self.collapsible_frame = CollapsibleFrame("Model reasoning - click to expand")
-            
-            # Create thinking content browser
-            thinking_browser = self._create_thinking_browser()
-            thinking_browser.setPlainText(self.thinking_content)
-            
-            self.collapsible_frame.set_content(thinking_browser)
-            self.collapsible_frame.collapse()  # Default collapsed
+            self.collapsible_frame = self._create_collapsible_thinking()
             bubble_layout.addWidget(self.collapsible_frame)
 
-        # Main content browser - dynamically expands to fit ALL content (always present)
-        self.content_browser = QTextBrowser()
-        self.content_browser.setReadOnly(True)
-        self.content_browser.setFrameShape(QFrame.Shape.NoFrame)
-        self.content_browser.setOpenExternalLinks(False)
-        self.content_browser.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.content_browser.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.content_browser.setLineWrapMode(QTextBrowser.LineWrapMode.WidgetWidth)  # Ensure word wrapping
-        self.content_browser.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-        self.content_browser.setProperty("class", "message_content")
-        self.content_browser.setSizeAdjustPolicy(QTextBrowser.SizeAdjustPolicy.AdjustToContents)
-        
-        # size policy for vertical expansion
-        self.content_browser.setSizePolicy(
-            QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum
-        )
-        
-        # Connect document size changes to trigger height adjustment
-        self.content_browser.document().documentLayout().documentSizeChanged.connect(
-            self._on_document_size_changed
-        )
-        
-        self.content_browser.setMinimumHeight(30)
-        
-        bubble_layout.addWidget(self.content_browser)
+        # User messages are short plain text: a word-wrapped QLabel lays out via
+        # QTextLayout without the full QTextDocument pipeline
+        if self.role == "user":
+            self.content_browser = None
+            self.content_label = QLabel()
+            self.content_label.setTextFormat(Qt.TextFormat.PlainText)
+            self.content_label.setWordWrap(True)
+            self.content_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+            self.content_label.setProperty("class", "message_content")
+            self.content_label.setSizePolicy(
+                QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum
+            )
+            self._content_widget = self.content_label
+            bubble_layout.addWidget(self.content_label)
+        else:
+            self.content_label = None
+            self._content_widget = self._create_content_browser()
+            bubble_layout.addWidget(self._content_widget)
 
         # Controls (timestamp + copy button)
         controls_layout = QHBoxLayout()
 
-        time_str = time.strftime("%H:%M", time.localtime(self.timestamp))
+        time_str = _fmt_hhmm(int(self.timestamp) // 60)
         # Add elapsed time if available (inline format: "14:23 • 2.4s")
         if self.elapsed_ms is not None:
-            elapsed_sec = self.elapsed_ms / 1000.0
-            time_str += f" • {elapsed_sec:.1f}s"
+            time_str += f" • {self.elapsed_ms / 1000.0:.1f}s"
         self.timestamp_label = QLabel(time_str)
-        self.timestamp_label.setStyleSheet("color: rgba(230, 230, 230, 0.95); font-size: 10px; font-weight: 500;")
+        self.timestamp_label.setStyleSheet(MessageUnit._TS_STYLE)
 
         self.copy_btn = QPushButton("Copy")
         self.copy_btn.setMaximumWidth(50)
@@ -213,30 +355,61 @@ class MessageUnit(QWidget):
 
         bubble_layout.addLayout(controls_layout)
 
-        # Alignment: user messages on right, assistant on left
-        if self.role == "user":
-            main_layout.addStretch()
-            main_layout.addWidget(self.bubble_frame)
-        else:
-            main_layout.addWidget(self.bubble_frame)
-            main_layout.addStretch()
+        # Alignment: user messages on right, assistant on left (alignment flag
+        # instead of a stretch spacer item per row)
+        alignment = Qt.AlignmentFlag.AlignRight if self.role == "user" else Qt.AlignmentFlag.AlignLeft
+        main_layout.addWidget(self.bubble_frame, 0, alignment)
 
         # Initial render
+        if self.content_label is not None:
+            self.content_label.setText(self.content)
+            return
         if self.content:
-            self.content_browser.setMarkdown(self.content)
+            self._render_markdown(self.content, store=True)
         self._adjust_height()
 
+    def _render_markdown(self, text: str, store: bool = False):
+        """Render markdown into content_browser, reusing cached HTML when possible
+
+        Only replay paths pass store=True; a freshly streamed reply is unique,
+        so serializing its document back to HTML would be wasted work.
+        """
+        browser = self.content_browser
+        palette = browser.palette()
+        key = (
+            text,
+            browser.document().defaultFont().key(),
+            palette.color(QPalette.ColorRole.Text).rgba(),
+            palette.color(QPalette.ColorRole.Link).rgba(),
+        )
+        cached = _RENDER_CACHE.get(key)
+        if cached is not None:
+            _RENDER_CACHE.move_to_end(key)
+            browser.setHtml(cached)
+            return
+        browser.setMarkdown(text)
+        if not store:
+            return
+        _RENDER_CACHE[key] = browser.document().toHtml()
+        if len(_RENDER_CACHE) > _RENDER_CACHE_MAX:
+            _RENDER_CACHE.popitem(last=False)
+
     def _adjust_height(self):
         """Adjust height to fit ALL content without internal scrolling"""
+        if self.content_browser is None:
+            return  # QLabel content sizes itself via heightForWidth
         try:
             doc = self.content_browser.document()
             if not doc:
                 return
                 
-            doc_height = doc.size().height()
+            doc_height = int(doc.size().height())
+            if doc_height == self._last_doc_height:
+                return  # Nothing changed; skip geometry invalidation
+            self._last_doc_height = doc_height
             
             # Calculate target height with padding
-            target_height = max(int(doc_height) + 20, 30)
+            target_height = max(doc_height + 20, 30)
             
             # Set minimum height to match content - allows natural expansion
             self.content_browser.setMinimumHeight(target_height)
@@ -249,57 +422,159 @@ class MessageUnit(QWidget):
         except Exception as e:
             logger.warning(f"Error adjusting height: {e}")
     
+    def _set_size_tracking(self, enabled: bool):
+        """Connect/disconnect documentSizeChanged -> _adjust_height.
+
+        Disabled while streaming; flushes adjust the height explicitly instead.
+        """
+        if self.content_browser is None or enabled == self._size_signal_connected:
+            return
+        signal = self.content_browser.document().documentLayout().documentSizeChanged
+        if enabled:
+            signal.connect(self._on_document_size_changed)
+        else:
+            signal.disconnect(self._on_document_size_changed)
+        self._size_signal_connected = enabled
+
     def _on_document_size_changed(self, new_size):
-        """Handle document size changes to dynamically adjust height"""
+        """Handle document size changes to dynamically adjust height
+
+        setMarkdown and bulk bubble insertion emit many size changes in one
+        tick; coalesce them into a single adjustment per event loop turn.
+        """
+        if abs(new_size.height() - self._last_doc_height) < 2.0:
+            return  # sub-pixel/1px jitter; not worth a geometry update
+        if not self._height_pending:
+            self._height_pending = True
+            QTimer.singleShot(0, self._do_adjust_height)
+
+    def _do_adjust_height(self):
+        """Run the coalesced height adjustment queued by _on_document_size_changed"""
+        self._height_pending = False
         self._adjust_height()
 
-    def _adjust_browser_height(self, browser: QTextBrowser):
-        """Adjust browser height to fit content (for thinking browser)"""
+    def _adjust_browser_height(self, browser: QTextBrowser, new_size=None):
+        """Adjust browser height to fit content (for thinking browser)
+
+        new_size absorbs the documentSizeChanged argument when bound via partial.
+        """
         doc = browser.document()
         doc_height = doc.size().height()
         target_height = max(int(doc_height) + 20, 30)
         browser.setFixedHeight(target_height)
         browser.updateGeometry()
 
+    def _get_plain_text(self) -> str:
+        """Get the displayed message text as plain text"""
+        if self.content_label is not None:
+            return self.content_label.text()
+        if self._detached:
+            self._reattach_content()
+        return self.content_browser.toPlainText()
+
     def _on_copy_clicked(self):
         """Copy response content to clipboard"""
-        QGuiApplication.clipboard().setText(self.content_browser.toPlainText())
+        QGuiApplication.clipboard().setText(self._get_plain_text())
         original_text = self.copy_btn.text()
         self.copy_btn.setText("Copied")
-        QTimer.singleShot(1500, lambda: self.copy_btn.setText(original_text))
+        QTimer.singleShot(1500, partial(self.copy_btn.setText, original_text))
     
     def _show_copy_menu(self, pos):
         """Show copy options menu (right-click)"""
-        menu = QMenu(self)
-        
-        # Copy response only (default)
-        copy_response = menu.addAction("Copy response")
-        copy_response.triggered.connect(self._on_copy_clicked)
+        # Built once on first use, then reused
+        if self._copy_menu is None:
+            self._copy_menu = QMenu(self)
+            
+            # Copy response only (default)
+            copy_response = self._copy_menu.addAction("Copy response")
+            copy_response.triggered.connect(self._on_copy_clicked)
+            
+            # Copy with thinking
+            self._copy_with_thinking_action = self._copy_menu.addAction("Copy with thinking")
+            self._copy_with_thinking_action.triggered.connect(self._on_copy_with_thinking)
         
-        # Copy with thinking (only if thinking content exists)
-        if self.thinking_content:
-            copy_all = menu.addAction("Copy with thinking")
-            copy_all.triggered.connect(self._on_copy_with_thinking)
+        # Only offer "Copy with thinking" if thinking content exists (may arrive on finalize)
+        self._copy_with_thinking_action.setVisible(bool(self.thinking_content))
         
-        # Show menu at cursor position
-        menu.exec(QCursor.pos())
+        # pos is in copy button coordinates
+        self._copy_menu.exec(self.copy_btn.mapToGlobal(pos))
     
     def _on_copy_with_thinking(self):
         """Copy both thinking and response content to clipboard"""
         full_content = ""
         if self.thinking_content:
             full_content += f"## Model Thinking\n\n{self.thinking_content}\n\n"
-        full_content += f"## Response\n\n{self.content_browser.toPlainText()}"
+        full_content += f"## Response\n\n{self._get_plain_text()}"
         
         QGuiApplication.clipboard().setText(full_content)
         original_text = self.copy_btn.text()
         self.copy_btn.setText("Copied")
-        QTimer.singleShot(1500, lambda: self.copy_btn.setText(original_text))
+        QTimer.singleShot(1500, partial(self.copy_btn.setText, original_text))
 
     def set_content(self, content: str):
         """Replace content entirely"""
+        if content == self.content:
+            return  # Skip markdown re-parse for no-op updates
         self.content = content
-        self.content_browser.setMarkdown(self.content)
+        if self.content_label is not None:
+            self.content_label.setText(self.content)
+            return
+        if self._detached:
+            self._detached = False
+            self._set_size_tracking(True)
+        self._render_markdown(self.content)
+        self._adjust_height()
+
+    def labels(self) -> List[QLabel]:
+        """QLabels inside this bubble, collected once the bubble is final
+
+        Streaming bubbles add and delete labels as they change phase, so
+        those are walked fresh on every call.
+        """
+        if self.is_streaming:
+            return self.findChildren(QLabel)
+        if self._label_cache is None:
+            self._label_cache = self.findChildren(QLabel)
+        return self._label_cache
+
+    def set_offscreen(self, offscreen: bool):
+        """Mark the bubble as scrolled out of (or back into) the viewport
+
+        Finalized assistant bubbles release their QTextDocument contents after
+        staying offscreen for a second; they are re-rendered on return.
+        """
+        if self.content_browser is None or self.is_streaming:
+            return
+        if offscreen:
+            if self._detached:
+                return
+            if self._detach_timer is None:
+                self._detach_timer = QTimer(self)
+                self._detach_timer.setSingleShot(True)
+                self._detach_timer.setInterval(1000)
+                self._detach_timer.timeout.connect(self._detach_content)
+            if not self._detach_timer.isActive():
+                self._detach_timer.start()
+        else:
+            if self._detach_timer:
+                self._detach_timer.stop()
+            if self._detached:
+                self._reattach_content()
+
+    def _detach_content(self):
+        """Clear the content document, keeping the bubble's current height"""
+        if self._detached or self.is_streaming or not self.content:
+            return
+        # Size tracking off so the empty document doesn't collapse the bubble
+        self._set_size_tracking(False)
+        self.content_browser.document().clear()
+        self._detached = True
+
+    def _reattach_content(self):
+        """Re-render the content document cleared by _detach_content"""
+        self._detached = False
+        self._render_markdown(self.content, store=True)
+        self._set_size_tracking(True)
         self._adjust_height()
 
     def set_collapsible_header(self, text: str):
@@ -322,7 +597,8 @@ class MessageUnit(QWidget):
     def start_streaming_thinking(self):
         """Initialize for thinking streaming mode"""
         self.is_streaming = True
-        self.streaming_phase = "thinking"
+        self.streaming_phase = StreamingPhase.THINKING
+        self._set_size_tracking(False)
         
         # Hide final content browser temporarily
         self.content_browser.hide()
@@ -352,7 +628,7 @@ class MessageUnit(QWidget):
 
     def update_thinking_stream(self, chunk: str):
         """Append thinking chunk during streaming"""
-        if self.streaming_phase != "thinking":
+        if self.streaming_phase is not StreamingPhase.THINKING:
             return
         
         self._thinking_buffer += chunk
@@ -362,11 +638,15 @@ class MessageUnit(QWidget):
     def start_streaming_response(self):
         """Initialize for direct response streaming (no thinking phase)"""
         self.is_streaming = True
-        self.streaming_phase = "response"
+        self.streaming_phase = StreamingPhase.RESPONSE
+        self._set_size_tracking(False)
         
-        # Hide content browser initially (will show when first token arrives)
+        # Stream into a plain-text view; it is shown when the first token arrives
         self.content_browser.hide()
-        self.content_browser.setText("")
+        if self._streaming_view is None:
+            self._streaming_view = self._create_streaming_view()
+        self._streaming_view.clear()
+        self._last_flushed_len = 0
         
         # Show typing indicator until first token arrives
         self._show_typing_indicator()
@@ -404,9 +684,9 @@ class MessageUnit(QWidget):
         
         # Start animation timer (if motion is allowed)
         if not self._reduce_motion:
-            self._typing_timer = QTimer(self)
-            self._typing_timer.timeout.connect(self._animate_typing_dots)
-            self._typing_timer.start(350)  # Update every 350ms
+            from .processing_header import SharedDotTimer
+            self._typing_timer = SharedDotTimer(self._animate_typing_dots)
+            self._typing_timer.start()  # Shared 350ms pulse
             self._typing_dots = 1
         else:
             # Reduced motion: show static dots
@@ -418,14 +698,30 @@ class MessageUnit(QWidget):
         """Animate the typing dots (● → ●● → ●●● → ●)"""
         if not self._typing_indicator:
             return
+        # Scrolled out of the viewport: skip the repaint
+        if self._typing_indicator.visibleRegion().isEmpty():
+            return
         self._typing_dots = (self._typing_dots % 3) + 1
         self._typing_indicator.setText("●" * self._typing_dots)
     
+    def showEvent(self, event):
+        """Resume the typing animation and restore detached content when shown again"""
+        super().showEvent(event)
+        if self._typing_timer and not self._typing_timer.isActive():
+            self._typing_timer.start()
+        if self._detached:
+            self._reattach_content()
+
+    def hideEvent(self, event):
+        """Pause the typing animation while the bubble is hidden"""
+        super().hideEvent(event)
+        if self._typing_timer:
+            self._typing_timer.stop()
+
     def _hide_typing_indicator(self):
         """Hide typing indicator (called when first token arrives)"""
         if self._typing_timer:
             self._typing_timer.stop()
-            self._typing_timer.deleteLater()
             self._typing_timer = None
         if self._typing_indicator:
             self._typing_indicator.hide()
@@ -436,7 +732,7 @@ class MessageUnit(QWidget):
     def transition_to_skeleton(self):
         """Transition from thinking to skeleton loader phase"""
         logger.debug("🎭 MessageUnit.transition_to_skeleton() CALLED")
-        self.streaming_phase = "skeleton"
+        self.streaming_phase = StreamingPhase.SKELETON
         
         # Hide/finish processing header
         if self._processing_header:
@@ -473,29 +769,44 @@ class MessageUnit(QWidget):
     def update_response_stream(self, chunk: str):
         """Buffer response chunks during streaming"""
         # Allow both skeleton phase AND direct response phase
-        if self.streaming_phase not in ("skeleton", "response"):
+        phase = self.streaming_phase
+        if phase < StreamingPhase.SKELETON or phase > StreamingPhase.RESPONSE:
             return
         
         # Hide typing indicator on first token (for direct response mode)
-        if not self._response_buffer and chunk and self._typing_indicator:
+        if chunk and self._typing_indicator and not self._response_buffer:
             self._hide_typing_indicator()
-            self.content_browser.show()
-            logger.debug("MessageUnit: First token received, showing content browser")
+            if self._streaming_view:
+                self._streaming_view.show()
+            logger.debug("MessageUnit: First token received, showing streaming view")
         
         self._response_buffer += chunk
         
         # FIX: In skeleton phase, just buffer content - don't transition yet!
         # The skeleton stays visible until finalize_streaming() is called with final content.
         # This creates the proper UX: thinking streams → skeleton appears → final response revealed
-        if self.streaming_phase == "skeleton":
+        if phase is StreamingPhase.SKELETON:
             # Just buffer, skeleton animation continues
-            logger.debug(f"buffering: {len(self._response_buffer)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"buffering: {len(self._response_buffer)}")
             return
         
-        # For direct response mode, update browser immediately
-        if self.streaming_phase == "response":
-            self.content_browser.setText(self._response_buffer)
-            self._adjust_height()
+        # Direct response mode: chunks arrive already batched by the worker
+        self._flush_response_buffer()
+
+    def _flush_response_buffer(self):
+        """Append the not-yet-rendered tail of the response buffer"""
+        if self.streaming_phase is not StreamingPhase.RESPONSE or self._streaming_view is None:
+            return
+        new_text = self._response_buffer[self._last_flushed_len:]
+        if not new_text:
+            return
+        # Append only the new tail so Qt lays out just the touched block
+        # (appendPlainText would start a new paragraph per flush)
+        cursor = QTextCursor(self._streaming_view.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(new_text)
+        self._last_flushed_len = len(self._response_buffer)
     
     def _transition_skeleton_to_response(self):
         """Transition from skeleton phase to live response streaming"""
@@ -518,11 +829,13 @@ class MessageUnit(QWidget):
             self._response_progress.stop()
             self._response_progress = None
         
-        # Switch to response phase and show content browser
-        self.streaming_phase = "response"
-        self.content_browser.show()
-        self.content_browser.setText(self._response_buffer)
-        self._adjust_height()
+        # Switch to response phase and show the streaming view
+        self.streaming_phase = StreamingPhase.RESPONSE
+        if self._streaming_view is None:
+            self._streaming_view = self._create_streaming_view()
+        self._streaming_view.setPlainText(self._response_buffer)
+        self._streaming_view.show()
+        self._last_flushed_len = len(self._response_buffer)
         logger.debug("✅ Now in live response streaming mode")
 
     def show_finalizing_state(self):
@@ -546,7 +859,7 @@ class MessageUnit(QWidget):
         """Complete streaming and show final content with transition"""
         logger.debug(f"finalize: think={len(final_thinking)} resp={len(final_response)}")
         self.is_streaming = False
-        self.streaming_phase = "final"
+        self.streaming_phase = StreamingPhase.FINAL
         
         # Stop progress controller
         if self._response_progress:
@@ -554,8 +867,9 @@ class MessageUnit(QWidget):
             self._response_progress = None
             logger.debug("  - Progress controller stopped")
         
-        # Start fade-out animation for skeleton/progress
-        if self._skeleton_loader:
+        # Start fade-out animation for skeleton/progress (skipped under reduced
+        # motion: the opacity effect renders the bubble offscreen every frame)
+        if self._skeleton_loader and not self._reduce_motion:
             logger.debug("  - Starting skeleton fade-out animation")
             # use QGraphicsOpacityEffect for fade
             self._opacity_effect_skeleton = QGraphicsOpacityEffect(self._skeleton_loader)
@@ -566,10 +880,12 @@ class MessageUnit(QWidget):
             self._fade_out_anim.setStartValue(1.0)
             self._fade_out_anim.setEndValue(0.0)
             self._fade_out_anim.setEasingCurve(QEasingCurve.Type.OutCubic)
-            self._fade_out_anim.finished.connect(lambda: self._show_final_content(final_thinking, final_response))
+            self._fade_out_anim.finished.connect(
+                partial(self._show_final_content, final_thinking, final_response)
+            )
             self._fade_out_anim.start()
         else:
-            logger.debug("  - No skeleton loader, showing final content immediately")
+            logger.debug("  - No fade-out, showing final content immediately")
             self._show_final_content(final_thinking, final_response)
 
     def _show_final_content(self, final_thinking: str, final_response: str):
@@ -591,15 +907,25 @@ class MessageUnit(QWidget):
             logger.debug("  - Deleted thinking browser")
         
         if self._skeleton_loader:
+            # Drop the fade-out effect right away rather than at deferred delete
+            self._skeleton_loader.setGraphicsEffect(None)
             self._skeleton_loader.deleteLater()
             self._skeleton_loader = None
             logger.debug("  - Deleted skeleton loader")
+        self._opacity_effect_skeleton = None
+        self._fade_out_anim = None
         
         if self._progress_label:
             self._progress_label.deleteLater()
             self._progress_label = None
             logger.debug("  - Deleted progress label")
         
+        if self._streaming_view:
+            self._streaming_view.hide()
+            self._streaming_view.deleteLater()
+            self._streaming_view = None
+            logger.debug("  - Deleted streaming view")
+        
         # Update thinking_content and content
         self.thinking_content = final_thinking
         self.content = final_response
@@ -607,18 +933,14 @@ class MessageUnit(QWidget):
         
         # Create collapsible thinking if needed
         if self.thinking_content and not self.collapsible_frame:
-            self.collapsible_frame = CollapsibleFrame("Model reasoning - click to expand")
-            
-            # Use helper method to create thinking browser
-            thinking_browser = self._create_thinking_browser()
-            thinking_browser.setPlainText(self.thinking_content)
-            
-            self.collapsible_frame.set_content(thinking_browser)
-            self.collapsible_frame.collapse()
+            self.collapsible_frame = self._create_collapsible_thinking()
             
             # Insert at position 0 (before content browser, which is hidden)
             self.bubble_frame.layout().insertWidget(0, self.collapsible_frame)
             logger.debug("  - Created collapsible thinking frame")
+
+        # Streaming labels are gone and the final ones are in place
+        self._label_cache = None
         
         # Show controls
         if hasattr(self, 'copy_btn'):
@@ -628,11 +950,15 @@ class MessageUnit(QWidget):
         logger.debug("  - Showed controls")
         
         # Show and populate main content browser
-        self.content_browser.setMarkdown(final_response)
+        self._set_size_tracking(True)
+        self._render_markdown(final_response)
         self._adjust_height()
         self.content_browser.show()
         logger.debug("  - Populated and showed content browser")
         
+        if self._reduce_motion:
+            return
+        
         # use QGraphicsOpacityEffect for fade-in
         self._opacity_effect_content = QGraphicsOpacityEffect(self.content_browser)
         self.content_browser.setGraphicsEffect(self._opacity_effect_content)
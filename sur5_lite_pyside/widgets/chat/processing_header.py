@@ -4,24 +4,46 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, Optional
+import os
+import platform
+import time
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 from PySide6.QtCore import (
     Qt,
+    QObject,
     QTimer,
+    Signal,
+    SIGNAL,
+    QAbstractAnimation,
     QEasingCurve,
     Property,
     QPropertyAnimation,
-    QPointF,
+    QRect,
 )
-from PySide6.QtGui import QPainter, QLinearGradient, QColor
+from PySide6.QtGui import QGuiApplication, QPainter, QLinearGradient, QColor
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton
 
+from utils.system_theme_detector import gsettings_get
 
-# Cache for reduced motion preference (detected once at startup)
-_reduced_motion_cache: Optional[bool] = None
+
+# Cache for reduced motion preference: (result, expiry on time.monotonic()).
+# A definitive answer never expires (expiry None); when no probe could answer
+# (tools missing, timeouts) the False fallback is retried after a short TTL.
+_reduced_motion_cache: Optional[Tuple[bool, Optional[float]]] = None
+_REDUCED_MOTION_RETRY_TTL_S = 30.0
+
+# Resolved once at import; platform.system() calls uname() on every use
+_SYSTEM = platform.system()
+
+# User overrides via environment (works on all platforms)
+_ENV_PREFERS_REDUCED_MOTION = (
+    os.environ.get("REDUCE_MOTION", "").lower() in ("1", "true", "yes")
+    or os.environ.get("GTK_ENABLE_ANIMATIONS", "").lower() in ("0", "false", "no")
+)
 
 
 def prefers_reduced_motion() -> bool:
@@ -36,40 +58,57 @@ def prefers_reduced_motion() -> bool:
     - Linux/Cinnamon: org.cinnamon.desktop.interface enable-animations
     - Environment variables: REDUCE_MOTION, GTK_ENABLE_ANIMATIONS
     
-    Result is cached after first call to avoid repeated subprocess invocations.
+    Result is cached after first call to avoid repeated subprocess invocations
+    (an undetermined result is retried after _REDUCED_MOTION_RETRY_TTL_S).
     """
     global _reduced_motion_cache
     
     # Return cached result if available
     if _reduced_motion_cache is not None:
-        return _reduced_motion_cache
-    
-    import os
-    import platform
+        result, expires = _reduced_motion_cache
+        if expires is None or time.monotonic() < expires:
+            return result
     
     # Check environment variables first (user override, works on all platforms)
-    env_reduce = os.environ.get("REDUCE_MOTION", "").lower()
-    if env_reduce in ("1", "true", "yes"):
-        _reduced_motion_cache = True
+    if _ENV_PREFERS_REDUCED_MOTION:
+        _reduced_motion_cache = (True, None)
         return True
     
-    gtk_animations = os.environ.get("GTK_ENABLE_ANIMATIONS", "").lower()
-    if gtk_animations in ("0", "false", "no"):
-        _reduced_motion_cache = True
-        return True
+    # Platform theme already knows the answer: no OS probing needed
+    qt_result = _check_reduced_motion_qt()
+    if qt_result is not None:
+        _reduced_motion_cache = (qt_result, None)
+        return qt_result
     
-    system = platform.system()
-    
-    if system == "Windows":
-        _reduced_motion_cache = _check_reduced_motion_windows()
-    elif system == "Linux":
-        _reduced_motion_cache = _check_reduced_motion_linux()
-    elif system == "Darwin":  # macOS
-        _reduced_motion_cache = _check_reduced_motion_macos()
+    if _SYSTEM == "Windows":
+        result = _check_reduced_motion_windows()
+    elif _SYSTEM == "Linux":
+        result = _check_reduced_motion_linux()
+    elif _SYSTEM == "Darwin":  # macOS
+        result = _check_reduced_motion_macos()
     else:
-        _reduced_motion_cache = False
+        result = False
     
-    return _reduced_motion_cache
+    if result is None:
+        _reduced_motion_cache = (False, time.monotonic() + _REDUCED_MOTION_RETRY_TTL_S)
+        return False
+    _reduced_motion_cache = (result, None)
+    return result
+
+
+def _check_reduced_motion_qt() -> Optional[bool]:
+    """Ask Qt's style hints, on Qt builds that expose a motion preference."""
+    app = QGuiApplication.instance()
+    if app is None:
+        return None
+    motion_preference = getattr(app.styleHints(), "motionPreference", None)
+    reduced = getattr(Qt, "PreferReducedMotion", None)
+    if motion_preference is None or reduced is None:
+        return None
+    try:
+        return motion_preference() == reduced
+    except Exception:
+        return None
 
 
 def _check_reduced_motion_windows() -> bool:
@@ -92,79 +131,130 @@ def _check_reduced_motion_windows() -> bool:
         return False
 
 
-def _check_reduced_motion_linux() -> bool:
-    """Check Linux desktop environment animation settings.
-    
-    Checks in order: GNOME -> KDE Plasma -> XFCE -> Cinnamon -> False
-    """
+def _run_motion_probe(cmd: List[str]) -> Optional[str]:
+    """Run a settings query and return its stripped stdout (None on failure)."""
     import subprocess
     
-    # 1. GNOME: Check via gsettings
     try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.gnome.desktop.interface", "enable-animations"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            if result.stdout.strip() == "false":
-                return True
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
     except Exception:
-        pass
-    
-    # 2. KDE Plasma: Check via kreadconfig5/kreadconfig6
-    for kread_cmd in ["kreadconfig6", "kreadconfig5"]:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def _probe_gsettings_animations(schema: str) -> Optional[bool]:
+    """GNOME/Cinnamon/MATE: enable-animations == false means reduced motion."""
+    # In-process via Gio when available (see gsettings_get)
+    value = gsettings_get(schema, "enable-animations")
+    if value is None:
+        return None
+    return value == "false"
+
+
+def _probe_kde_animations() -> Optional[bool]:
+    """KDE Plasma: AnimationDurationFactor of 0 means animations disabled."""
+    for kread_cmd in ("kreadconfig6", "kreadconfig5"):
+        factor = _run_motion_probe(
+            [kread_cmd, "--file", "kdeglobals", "--group", "KDE",
+             "--key", "AnimationDurationFactor"]
+        )
+        if factor is None:
+            continue
+        if not factor:
+            return False  # Key unset: default factor applies
         try:
-            result = subprocess.run(
-                [kread_cmd, "--file", "kdeglobals", "--group", "KDE", 
-                 "--key", "AnimationDurationFactor"],
-                capture_output=True, text=True, timeout=2
-            )
-            if result.returncode == 0:
-                factor = result.stdout.strip()
-                # Factor of 0 means animations disabled
-                if factor and float(factor) == 0:
-                    return True
-        except Exception:
-            pass
+            return float(factor) == 0
+        except ValueError:
+            return None
+    return None
+
+
+def _probe_xfce_compositing() -> Optional[bool]:
+    """XFCE: no direct animation setting; compositing off is the closest hint."""
+    value = _run_motion_probe(["xfconf-query", "-c", "xfwm4", "-p", "/general/use_compositing"])
+    if value is None:
+        return None
+    return value.lower() == "false"
+
+
+_gnome_motion_probe = partial(_probe_gsettings_animations, "org.gnome.desktop.interface")
+_cinnamon_motion_probe = partial(_probe_gsettings_animations, "org.cinnamon.desktop.interface")
+_mate_motion_probe = partial(_probe_gsettings_animations, "org.mate.interface")
+
+# XDG_CURRENT_DESKTOP token -> probes for that desktop
+_LINUX_MOTION_PROBES: Dict[str, Tuple[Callable[[], Optional[bool]], ...]] = {
+    "GNOME": (_gnome_motion_probe,),
+    "UNITY": (_gnome_motion_probe,),
+    "KDE": (_probe_kde_animations,),
+    "XFCE": (_probe_xfce_compositing,),
+    "X-CINNAMON": (_cinnamon_motion_probe,),
+    "CINNAMON": (_cinnamon_motion_probe,),
+    "MATE": (_mate_motion_probe,),
+}
+
+# Every probe, for unknown desktops or when the desktop's own probe can't answer
+_ALL_LINUX_MOTION_PROBES = (
+    _gnome_motion_probe,
+    _probe_kde_animations,
+    _probe_xfce_compositing,
+    _cinnamon_motion_probe,
+    _mate_motion_probe,
+)
+
+# Probes for the current desktop, resolved from XDG_CURRENT_DESKTOP on first use
+_linux_motion_probes: Optional[Tuple[Callable[[], Optional[bool]], ...]] = None
+
+
+def _select_linux_motion_probes() -> Tuple[Callable[[], Optional[bool]], ...]:
+    """Pick the probes matching $XDG_CURRENT_DESKTOP (all of them if unknown)."""
+    for token in os.environ.get("XDG_CURRENT_DESKTOP", "").upper().split(":"):
+        probes = _LINUX_MOTION_PROBES.get(token)
+        if probes:
+            return probes
+    return _ALL_LINUX_MOTION_PROBES
+
+
+def _run_motion_probes_parallel(probes) -> Optional[bool]:
+    """Run probes concurrently; True on the first positive, None if none answered."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     
-    # 3. XFCE: Check via xfconf-query (no direct animation setting, check theme hints)
+    answered = None
+    executor = ThreadPoolExecutor(max_workers=len(probes))
     try:
-        result = subprocess.run(
-            ["xfconf-query", "-c", "xfwm4", "-p", "/general/use_compositing"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            # Compositing disabled often means reduced animations preferred
-            if result.stdout.strip().lower() == "false":
+        futures = [executor.submit(probe) for probe in probes]
+        for future in as_completed(futures):
+            result = future.result()
+            if result:
                 return True
-    except Exception:
-        pass
+            if result is not None:
+                answered = False
+    finally:
+        # Don't wait on slow stragglers once the answer is known
+        executor.shutdown(wait=False, cancel_futures=True)
+    return answered
+
+
+def _check_reduced_motion_linux() -> Optional[bool]:
+    """Check Linux desktop environment animation settings.
     
-    # 4. Cinnamon: Check via gsettings
-    try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.cinnamon.desktop.interface", "enable-animations"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            if result.stdout.strip() == "false":
-                return True
-    except Exception:
-        pass
+    Only the current desktop's backend is queried; unknown desktops query
+    GNOME, KDE Plasma, XFCE, Cinnamon and MATE in parallel. Returns None when
+    no probe could answer.
+    """
+    global _linux_motion_probes
     
-    # 5. MATE: Check via gsettings
-    try:
-        result = subprocess.run(
-            ["gsettings", "get", "org.mate.interface", "enable-animations"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            if result.stdout.strip() == "false":
-                return True
-    except Exception:
-        pass
+    if _linux_motion_probes is None:
+        _linux_motion_probes = _select_linux_motion_probes()
     
-    return False
+    probes = _linux_motion_probes
+    if len(probes) == 1:
+        result = probes[0]()
+        if result is not None:
+            return result
+        probes = _ALL_LINUX_MOTION_PROBES
+    return _run_motion_probes_parallel(probes)
 
 
 def _check_reduced_motion_macos() -> bool:
@@ -193,20 +283,84 @@ def clear_reduced_motion_cache() -> None:
 prefers_reduced_motion_windows = prefers_reduced_motion
 
 
+# Dot strings by count, so animation ticks don't build new strings
+_DOT_STRINGS = ("", ".", "..", "...")
+
+
+class _SharedAnimationPulse(QObject):
+    """Single 350ms timer behind every dot animation (one wakeup per tick)."""
+
+    tick = Signal()
+    _instance: Optional["_SharedAnimationPulse"] = None
+
+    def __init__(self):
+        super().__init__()
+        self._timer = QTimer(self)
+        self._timer.setInterval(350)
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @classmethod
+    def instance(cls) -> "_SharedAnimationPulse":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def ensure_running(self) -> None:
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _on_timeout(self) -> None:
+        # Connections of deleted widgets are dropped by Qt; idle once nobody listens
+        if self.receivers(SIGNAL("tick()")) == 0:
+            self._timer.stop()
+            return
+        self.tick.emit()
+
+
+class SharedDotTimer:
+    """QTimer-like start/stop handle that subscribes a callback to the shared pulse."""
+
+    def __init__(self, callback: Callable[[], None]):
+        self._callback = callback
+        self._active = False
+
+    def start(self) -> None:
+        if self._active:
+            return
+        pulse = _SharedAnimationPulse.instance()
+        pulse.tick.connect(self._callback)
+        pulse.ensure_running()
+        self._active = True
+
+    def stop(self) -> None:
+        if not self._active:
+            return
+        _SharedAnimationPulse.instance().tick.disconnect(self._callback)
+        self._active = False
+
+    def isActive(self) -> bool:
+        return self._active
+
+
+@lru_cache(maxsize=64)
 def _hex_to_qcolor(hex_str: str) -> QColor:
+    # Cached and shared between callers: copy before mutating
     color = QColor(hex_str)
     return color if color.isValid() else QColor(255, 255, 255)
 
 
-def _luminance(qc: QColor) -> float:
-    def _channel(value: int) -> float:
-        normalized = value / 255.0
-        if normalized <= 0.04045:
-            return normalized / 12.92
-        return ((normalized + 0.055) / 1.055) ** 2.4
+# sRGB channel value (0-255) -> linear light, precomputed instead of pow() per call
+_SRGB_LINEAR = tuple(
+    v / 255.0 / 12.92 if v / 255.0 <= 0.04045 else ((v / 255.0 + 0.055) / 1.055) ** 2.4
+    for v in range(256)
+)
+
 
-    r, g, b = _channel(qc.red()), _channel(qc.green()), _channel(qc.blue())
-    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+def _luminance(qc: QColor) -> float:
+    return (0.2126 * _SRGB_LINEAR[qc.red()]
+            + 0.7152 * _SRGB_LINEAR[qc.green()]
+            + 0.0722 * _SRGB_LINEAR[qc.blue()])
 
 
 def _color_with_alpha(qc: QColor, alpha_0_255: int) -> QColor:
@@ -239,6 +393,8 @@ def _compute_shimmer_band(theme_colors: Dict[str, str]) -> QColor:
 class ProcessingHeader(QWidget):
     """UI-only header shown while a response is processing."""
 
+    _TRANSPARENT = QColor(0, 0, 0, 0)
+
     def __init__(
             self,
             parent: Optional[QWidget] = None,
@@ -253,10 +409,14 @@ class ProcessingHeader(QWidget):
         self._animating = False
         self._active = False
         self._gradient_pos = 0.0
+        self._last_band_rect = QRect()  # area covered by the last shimmer frame
         self._debounce_shown = False
         self._dot_state = 0
         self._skip_available = True
         self._theme_colors: Dict[str, str] = {}
+        self._conv_service = None  # Stop/Skip target, resolved lazily
+        # Shimmer band color, recomputed only when the theme changes
+        self._shimmer_band = _compute_shimmer_band(self._theme_colors)
 
         self.setAccessibleName("Processing status")
         self.setAccessibleDescription("Model is preparing a response.")
@@ -298,9 +458,7 @@ class ProcessingHeader(QWidget):
         self._debounce.setInterval(250)
         self._debounce.timeout.connect(self._start_if_needed)
 
-        self._dots = QTimer(self)
-        self._dots.setInterval(350)
-        self._dots.timeout.connect(self._advance_dots)
+        self._dots = SharedDotTimer(self._advance_dots)
 
         self._shimmer = QPropertyAnimation(self, b"gradientPos")
         self._shimmer.setDuration(1200)
@@ -325,14 +483,39 @@ class ProcessingHeader(QWidget):
 
     def setGradientPos(self, value: float) -> None:
         self._gradient_pos = value
-        self.update()
+        # Scrolled out of the viewport: nothing to repaint
+        if self.visibleRegion().isEmpty():
+            return
+        # Repaint only where the band was and where it is now
+        band_rect = self._band_rect()
+        self.update(band_rect.united(self._last_band_rect))
+        self._last_band_rect = band_rect
+
+    def _band_rect(self) -> QRect:
+        """Bounding rect of the shimmer band at the current gradient position"""
+        rect = self.rect()
+        band_width = rect.width() * 0.2
+        if band_width <= 0:
+            return QRect()
+        # The gradient runs corner to corner, so the band leans past its
+        # nominal x-range by height^2 / band_width at the top and bottom
+        lean = rect.height() * rect.height() / band_width
+        left = rect.left() + rect.width() * self._gradient_pos - lean
+        return QRect(int(left) - 1, rect.top(), int(band_width + 2 * lean) + 3, rect.height())
 
     gradientPos = Property(float, getGradientPos, setGradientPos)
 
     def set_theme_colors(self, theme_colors: Optional[Dict[str, str]]):
         self._theme_colors = dict(theme_colors or {})
+        self._shimmer_band = _compute_shimmer_band(self._theme_colors)
         self.update()
 
+    def _conversation_service(self):
+        # Resolve from the main window once and keep it
+        if self._conv_service is None:
+            self._conv_service = getattr(self.window(), "conversation_service", None)
+        return self._conv_service
+
     def set_skip_available(self, available: bool):
         self._skip_available = bool(available)
         if not self._active:
@@ -387,6 +570,22 @@ class ProcessingHeader(QWidget):
         self.setProperty("aria-busy", "false")
         self.hide()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Resume animations paused by hideEvent
+        if self._animating and not self._reduce_motion:
+            if not self._dots.isActive():
+                self._dots.start()
+            if self._shimmer.state() == QAbstractAnimation.State.Paused:
+                self._shimmer.resume()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        # No repaints while hidden; _stop_all still resets state on finish()
+        self._dots.stop()
+        if self._shimmer.state() == QAbstractAnimation.State.Running:
+            self._shimmer.pause()
+
     def _start_if_needed(self):
         if self._debounce_shown:
             return
@@ -398,17 +597,21 @@ class ProcessingHeader(QWidget):
             self._shimmer.start()
             logger.debug("Dot and shimmer animations started")
         else:
-            # Reduced motion: still cycle dots, but disable shimmer effect
-            self._dots.start()
+            # Reduced motion: static dots, no shimmer, no timer wakeups
+            self._dots.stop()
             self._shimmer.stop()
-            logger.debug("Shimmer disabled (reduced motion mode), dots still cycle")
+            self._dot_state = 3
+            self.dot_label.setText(_DOT_STRINGS[3])
+            logger.debug("Animations disabled (reduced motion mode), dots static")
 
     def _advance_dots(self):
         # Guard: only update if header is active
         if not self._active or not self._animating:
             return
         self._dot_state = (self._dot_state % 3) + 1  # Cycles: 1 → 2 → 3 → 1
-        self.dot_label.setText("." * self._dot_state)
+        text = _DOT_STRINGS[self._dot_state]
+        if self.dot_label.text() != text:  # setText dirties the label unconditionally
+            self.dot_label.setText(text)
 
     def _stop_all(self):
         self._debounce.stop()
@@ -416,7 +619,9 @@ class ProcessingHeader(QWidget):
         self._shimmer.stop()
         self._animating = False
         # Preserve dots (at least one) to avoid mid-cycle blanking
-        self.dot_label.setText("." * max(1, self._dot_state or 1))
+        text = _DOT_STRINGS[max(1, self._dot_state or 1)]
+        if self.dot_label.text() != text:
+            self.dot_label.setText(text)
         self.update()
 
     def _on_stop_clicked(self):
@@ -424,13 +629,9 @@ class ProcessingHeader(QWidget):
         self.on_first_token()
         
         # Request immediate stop from conversation service
-        window = self.window()
-        try:
-            if hasattr(window, "conversation_service"):
-                service = window.conversation_service
-                service.stop_generation_immediate()
-        except Exception:
-            pass
+        service = self._conversation_service()
+        if service:
+            service.stop_generation_immediate()
         
         self.stop_btn.setEnabled(False)
         self.stop_btn.setVisible(False)
@@ -442,13 +643,9 @@ class ProcessingHeader(QWidget):
         self.on_first_token()
         
         # Request skip from conversation service
-        window = self.window()
-        try:
-            if hasattr(window, "conversation_service"):
-                service = window.conversation_service
-                service.skip_thinking()
-        except Exception:
-            pass
+        service = self._conversation_service()
+        if service:
+            service.skip_thinking()
         
         self.skip_btn.setEnabled(False)
         self.skip_btn.setVisible(False)
@@ -466,14 +663,11 @@ class ProcessingHeader(QWidget):
         start_x = rect.left() + width * self._gradient_pos
         end_x = rect.left() + width * (self._gradient_pos + 0.2)
 
-        gradient = QLinearGradient(
-            QPointF(
-                start_x, rect.top()), QPointF(
-                end_x, rect.bottom()))
-        band = _compute_shimmer_band(self._theme_colors)
-        transparent = QColor(0, 0, 0, 0)
+        gradient = QLinearGradient(start_x, rect.top(), end_x, rect.bottom())
+        transparent = self._TRANSPARENT
         gradient.setColorAt(0.0, transparent)
-        gradient.setColorAt(0.5, band)
+        gradient.setColorAt(0.5, self._shimmer_band)
         gradient.setColorAt(1.0, transparent)
 
-        painter.fillRect(rect, gradient)
+        # Only the invalidated band area needs filling (see setGradientPos)
+        painter.fillRect(event.rect(), gradient)
@@ -8,6 +8,8 @@ from PySide6.QtCore import QObject, QTimer
 from PySide6.QtWidgets import QLabel
 from typing import Optional
 
+from .processing_header import SharedDotTimer, _DOT_STRINGS
+
 
 class ResponseProgressController(QObject):
     """
@@ -28,11 +30,14 @@ class ResponseProgressController(QObject):
             "Sur is drafting response",
             "Sur is refining wording"
         ]
+        # Full label text per (phase, dot count), built once
+        self._phase_strings = [
+            [f"{phase}{_DOT_STRINGS[dots]}" for dots in range(len(_DOT_STRINGS))]
+            for phase in self.phases
+        ]
         
-        # Timer for dot animation (350ms like ProcessingHeader)
-        self._dot_timer = QTimer(self)
-        self._dot_timer.timeout.connect(self._advance_dots)
-        self._dot_timer.setInterval(350)  # 350ms per dot update
+        # Dot animation on the 350ms pulse shared with ProcessingHeader
+        self._dot_timer = SharedDotTimer(self._advance_dots)
         
         # Timer for phase transitions (2 seconds = ~6 dot cycles)
         self._phase_timer = QTimer(self)
@@ -90,8 +95,8 @@ class ResponseProgressController(QObject):
             return
         
         if self._current_phase < len(self.phases):
-            base_text = self.phases[self._current_phase]
-            dots = "." * self._dot_count
-            self.progress_label.setText(f"{base_text}{dots}")
+            text = self._phase_strings[self._current_phase][self._dot_count]
+            if self.progress_label.text() != text:  # setText dirties the label unconditionally
+                self.progress_label.setText(text)
 
 
@@ -4,13 +4,16 @@ Skeleton Loader Widget with Shimmer Animation
 Modern loading placeholder for Tier 2 response bubble
 """
 
-from typing import Dict, Optional
-from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, Property
-from PySide6.QtGui import QPainter, QLinearGradient, QColor, QPen
+from typing import Dict, List, Optional
+from PySide6.QtCore import Qt, QTimer, QAbstractAnimation, QPropertyAnimation, QEasingCurve, Property, QRect, QRectF
+from PySide6.QtGui import QPainter, QPainterPath, QLinearGradient, QColor, QPen, QPixmap
 from PySide6.QtWidgets import QWidget
 
 # Import cross-platform reduced motion detection from processing_header
-from .processing_header import prefers_reduced_motion
+from .processing_header import prefers_reduced_motion, _color_with_alpha, _hex_to_qcolor, _luminance
+
+# Line widths as a fraction of the container width
+_LINE_WIDTHS = (1.0, 0.95, 0.80)
 
 
 class SkeletonLoaderWidget(QWidget):
@@ -36,7 +39,7 @@ class SkeletonLoaderWidget(QWidget):
         self._shimmer_color = QColor(255, 255, 255, 38)  # 15% alpha
         
         # Line specifications
-        self.line_widths = [1.0, 0.95, 0.80]  # Percentage of container width
+        self.line_widths = _LINE_WIDTHS  # Percentage of container width
         self.line_height = 16
         self.line_spacing = 8
         self.corner_radius = 6
@@ -46,8 +49,18 @@ class SkeletonLoaderWidget(QWidget):
         self.setMinimumHeight(total_height)
         self.setMaximumHeight(total_height)
         
-        # shimmer
+        # Pre-rendered bars and shimmer band per line (+ its clip path), rebuilt
+        # on resize/theme change so each frame is a blit instead of a fill
+        self._bg_pixmap: Optional[QPixmap] = None
+        self._cache_dpr = 0.0  # device pixel ratio the pixmaps were rendered at
+        self._line_rects: List[QRect] = []  # per-line bar geometry, set on resize
+        self._shimmer_pixmaps: List[QPixmap] = []
+        self._line_paths: List[QPainterPath] = []
+        self._last_shimmer_rect = QRect()
+        
+        # shimmer (runs only while the widget is shown; see showEvent/hideEvent)
         self._shimmer_animation = None
+        self._shimmer_wanted = False
         if not self._reduce_motion:
             self._setup_shimmer_animation()
     
@@ -59,7 +72,7 @@ class SkeletonLoaderWidget(QWidget):
         self._shimmer_animation.setEndValue(1.0)
         self._shimmer_animation.setEasingCurve(QEasingCurve.Type.Linear)
         self._shimmer_animation.setLoopCount(-1)  # Infinite loop
-        self._shimmer_animation.start()
+        self._shimmer_wanted = True
     
     def set_theme_colors(self, theme_colors: Dict[str, str]):
         """
@@ -70,49 +83,25 @@ class SkeletonLoaderWidget(QWidget):
         """
         # Parse skeleton background color
         bg_tertiary = theme_colors.get("bg_tertiary", "#262626")
-        self._skeleton_bg = QColor(bg_tertiary)
+        self._skeleton_bg = _hex_to_qcolor(bg_tertiary)
         
         # Determine shimmer color based on theme brightness
         text_primary = theme_colors.get("text_primary", "#ffffff")
         primary = theme_colors.get("primary", "#20B2AA")
         
         # Calculate luminance to determine if theme is dark or light
-        luminance = self._calculate_luminance(self._skeleton_bg)
+        luminance = _luminance(self._skeleton_bg)
         
         if luminance < 0.5:  # Dark theme
             # Use text_primary with 15% alpha
-            text_color = QColor(text_primary)
-            self._shimmer_color = QColor(
-                text_color.red(),
-                text_color.green(),
-                text_color.blue(),
-                38  # 15% of 255
-            )
+            self._shimmer_color = _color_with_alpha(_hex_to_qcolor(text_primary), 38)
         else:  # Light theme
             # Use primary with 12% alpha
-            primary_color = QColor(primary)
-            self._shimmer_color = QColor(
-                primary_color.red(),
-                primary_color.green(),
-                primary_color.blue(),
-                31  # 12% of 255
-            )
+            self._shimmer_color = _color_with_alpha(_hex_to_qcolor(primary), 31)
         
+        self._bg_pixmap = None  # Rebuilt with the new colors on next paint
         self.update()  # Trigger repaint
     
-    def _calculate_luminance(self, color: QColor) -> float:
-        """Calculate relative luminance of a color"""
-        def channel(value: int) -> float:
-            normalized = value / 255.0
-            if normalized <= 0.04045:
-                return normalized / 12.92
-            return ((normalized + 0.055) / 1.055) ** 2.4
-        
-        r = channel(color.red())
-        g = channel(color.green())
-        b = channel(color.blue())
-        return 0.2126 * r + 0.7152 * g + 0.0722 * b
-    
     @Property(float)
     def shimmer_position(self) -> float:
         """Get shimmer position (for animation)"""
@@ -122,69 +111,127 @@ class SkeletonLoaderWidget(QWidget):
     def shimmer_position(self, value: float):
         """Set shimmer position and trigger repaint"""
         self._shimmer_position = value
-        self.update()
+        # Scrolled out of the viewport: nothing to repaint (the animation
+        # driver already paces ticks, so every visible tick is painted)
+        if self.visibleRegion().isEmpty():
+            return
+        # Repaint only where the bands were and where they are now
+        shimmer_rect = self._shimmer_rect()
+        self.update(shimmer_rect.united(self._last_shimmer_rect))
+        self._last_shimmer_rect = shimmer_rect
+    
+    def _shimmer_rect(self) -> QRect:
+        """Bounding rect of the shimmer bands across all lines"""
+        if not self._line_rects:
+            return self.rect()
+        start = (self._shimmer_position + 1.0) / 2.0 - 0.2
+        left = min(int(r.width() * start) for r in self._line_rects)
+        right = max(int(r.width() * start) + int(r.width() * 0.4) for r in self._line_rects)
+        return QRect(left - 1, 0, right - left + 2, self.height())
+    
+    def showEvent(self, event):
+        """Start or resume the shimmer when the skeleton becomes visible"""
+        super().showEvent(event)
+        animation = self._shimmer_animation
+        if animation and self._shimmer_wanted:
+            if animation.state() == QAbstractAnimation.State.Paused:
+                animation.resume()
+            elif animation.state() == QAbstractAnimation.State.Stopped:
+                animation.start()
+    
+    def hideEvent(self, event):
+        """Pause the shimmer while hidden"""
+        super().hideEvent(event)
+        animation = self._shimmer_animation
+        if animation and animation.state() == QAbstractAnimation.State.Running:
+            animation.pause()
+    
+    def resizeEvent(self, event):
+        """Recompute line geometry and invalidate the pre-rendered bars and bands"""
+        super().resizeEvent(event)
+        width = event.size().width()
+        step = self.line_height + self.line_spacing
+        self._line_rects = [
+            QRect(0, i * step, int(width * self.line_widths[i]), self.line_height)
+            for i in range(self.line_count)
+        ]
+        self._bg_pixmap = None
+    
+    def _build_paint_cache(self):
+        """Render the skeleton bars, each line's shimmer band and clip path once"""
+        width = self.width()
+        dpr = self.devicePixelRatioF()
+        self._cache_dpr = dpr
+        
+        self._bg_pixmap = QPixmap(max(1, int(width * dpr)), max(1, int(self.height() * dpr)))
+        self._bg_pixmap.setDevicePixelRatio(dpr)
+        self._bg_pixmap.fill(Qt.GlobalColor.transparent)
+        bg_painter = QPainter(self._bg_pixmap)
+        bg_painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        bg_painter.setPen(Qt.PenStyle.NoPen)
+        bg_painter.setBrush(self._skeleton_bg)
+        
+        self._shimmer_pixmaps = []
+        self._line_paths = []
+        for line_rect in self._line_rects:
+            line_width = line_rect.width()
+            
+            path = QPainterPath()
+            path.addRoundedRect(QRectF(line_rect), self.corner_radius, self.corner_radius)
+            self._line_paths.append(path)
+            bg_painter.drawPath(path)
+            
+            # Gradient band = 40% of the line: transparent -> shimmer -> transparent
+            band_width = max(1, int(line_width * 0.4))
+            pixmap = QPixmap(int(band_width * dpr), int(self.line_height * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            gradient = QLinearGradient(0, 0, band_width, 0)
+            gradient.setColorAt(0.0, QColor(0, 0, 0, 0))
+            gradient.setColorAt(0.5, self._shimmer_color)
+            gradient.setColorAt(1.0, QColor(0, 0, 0, 0))
+            band_painter = QPainter(pixmap)
+            band_painter.fillRect(0, 0, band_width, self.line_height, gradient)
+            band_painter.end()
+            self._shimmer_pixmaps.append(pixmap)
+        
+        bg_painter.end()
     
     def paintEvent(self, event):
         """Draw skeleton lines with shimmer effect"""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Rebuild after resize/theme change or a move to a screen with another DPI
+        if self._bg_pixmap is None or self.devicePixelRatioF() != self._cache_dpr:
+            self._build_paint_cache()
         
-        width = self.width()
-        y_offset = 0
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._bg_pixmap)
         
-        for i in range(self.line_count):
-            # Calculate line width
-            line_width = int(width * self.line_widths[i])
-            
-            # Draw skeleton bar background
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(self._skeleton_bg)
-            painter.drawRoundedRect(
-                0, y_offset,
-                line_width, self.line_height,
-                self.corner_radius, self.corner_radius
-            )
+        if not self._reduce_motion:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            # Bands are translucent: blend over the bars
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
             
-            # Draw shimmer gradient (if not reduced motion)
-            if not self._reduce_motion:
-                # Calculate shimmer gradient position
-                # Shimmer moves from -1 (off-screen left) to 1 (off-screen right)
-                gradient_center = (self._shimmer_position + 1.0) / 2.0  # Normalize to 0-1
-                gradient_start = gradient_center - 0.2  # Gradient width = 40% of container
-                gradient_end = gradient_center + 0.2
-                
-                # Create linear gradient
-                gradient = QLinearGradient(
-                    line_width * gradient_start, 0,
-                    line_width * gradient_end, 0
-                )
-                
-                # Gradient colors: transparent -> shimmer -> transparent
-                gradient.setColorAt(0.0, QColor(0, 0, 0, 0))
-                gradient.setColorAt(0.5, self._shimmer_color)
-                gradient.setColorAt(1.0, QColor(0, 0, 0, 0))
-                
-                # Draw shimmer overlay
-                painter.setBrush(gradient)
-                painter.drawRoundedRect(
-                    0, y_offset,
-                    line_width, self.line_height,
-                    self.corner_radius, self.corner_radius
-                )
+            # Shimmer moves from -1 (off-screen left) to 1 (off-screen right)
+            gradient_start = (self._shimmer_position + 1.0) / 2.0 - 0.2
             
-            # Move to next line
-            y_offset += self.line_height + self.line_spacing
-        
-        painter.end()
+            for line_rect, path, band in zip(self._line_rects, self._line_paths, self._shimmer_pixmaps):
+                # Blit the pre-rendered shimmer band, clipped to the rounded bar
+                # (each setClipPath replaces the last; no save/restore per line)
+                painter.setClipPath(path)
+                painter.drawPixmap(int(line_rect.width() * gradient_start), line_rect.y(), band)
+        # painter ends when it goes out of scope
     
     def stop_animation(self):
         """Stop shimmer animation"""
+        self._shimmer_wanted = False
         if self._shimmer_animation:
             self._shimmer_animation.stop()
     
     def start_animation(self):
         """Start shimmer animation (if not reduced motion)"""
         if self._shimmer_animation and not self._reduce_motion:
-            self._shimmer_animation.start()
+            self._shimmer_wanted = True
+            if self.isVisible():
+                self._shimmer_animation.start()
 
 
@@ -8,8 +8,9 @@ Displays chat messages with virtualization and modern bubble styling
 import time
 import html
 import re
-import json
 import logging
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Match
 
 logger = logging.getLogger(__name__)
@@ -32,10 +33,48 @@ from PySide6.QtCore import Qt, QTimer, Signal, QObject, QPropertyAnimation, QEas
 from PySide6.QtGui import QColor, QFont, QTextCharFormat, QTextDocument, QGuiApplication, QPixmap
 
 from .processing_header import ProcessingHeader, prefers_reduced_motion_windows
-from .message_unit import MessageUnit
+from .message_unit import MessageUnit, _fmt_hhmm
 from .skeleton_loader import SkeletonLoaderWidget
 from .response_progress_controller import ResponseProgressController
 
+# Optional linear-time engine for the lookaround-free tag pattern
+try:
+    import re2 as _fast_re  # google-re2
+except ImportError:
+    _fast_re = re
+
+# Sentinel-tag sanitizer patterns (compiled once; used on every streamed chunk)
+# Complete sentinel tags, else leftover tag fragments, removed in one pass
+_TAG_KILL = _fast_re.compile(
+    r"(?i)<\s*/?\s*(?:thinking|think|final_answer)(?:\b[^>]*)?>"
+    r"|<\s*/?\s*(?:thinking|think|final_answer)\b"
+)
+# Longest trailing "<..." run held back in case a tag straddles two chunks
+_SANITIZE_TAIL_LEN = 20
+_SENTINEL_TAG_NAMES = ("thinking", "think", "final_answer")
+
+
+# Search highlight spans; black text on orange (current) or yellow (other) results
+_HIGHLIGHT_SPAN_STYLE = "color: #000000; padding: 2px 4px; border-radius: 3px; font-weight: bold;"
+_HIGHLIGHT_SPAN_CURRENT = f'<span style="background-color: #ff9800; {_HIGHLIGHT_SPAN_STYLE}">'
+_HIGHLIGHT_SPAN_OTHER = f'<span style="background-color: #ffeb3b; {_HIGHLIGHT_SPAN_STYLE}">'
+_HIGHLIGHT_SPAN_CLOSE = "</span>"
+
+
+@lru_cache(maxsize=32)
+def _search_pattern(search_term: str):
+    """Case-insensitive pattern for the HTML-escaped term, compiled once per term"""
+    return re.compile(re.escape(html.escape(search_term)), re.IGNORECASE)
+
+
+def _may_grow_into_sentinel(tail: str) -> bool:
+    """Whether a trailing "<..." run is still a possible sentinel tag prefix.
+
+    Ordinary text such as "a < b" is not, so it streams through unheld.
+    """
+    name = tail[1:].lstrip().lstrip("/").lstrip().lower()
+    return any(tag.startswith(name) or name.startswith(tag) for tag in _SENTINEL_TAG_NAMES)
+
 
 class ChatThreadView(QScrollArea):
 
@@ -45,6 +84,9 @@ class ChatThreadView(QScrollArea):
 
     message_clicked = Signal(dict)  # message_data
 
+    # Empty-state logo, decoded on first use (null QPixmap if missing)
+    _cached_logo_pixmap: Optional[QPixmap] = None
+
     def __init__(self, parent=None):
 
         super().__init__(parent)
@@ -55,6 +97,9 @@ class ChatThreadView(QScrollArea):
 
         self.message_widgets: List[QWidget] = []
 
+        # Plain text of labels touched by search highlighting, for restoring
+        self._search_original_text: Dict[QLabel, str] = {}
+
         # Current streaming state - simple temporary widgets
         self.current_thinking_widget: Optional[QWidget] = None
         self.current_response_widget: Optional[QWidget] = None
@@ -70,6 +115,9 @@ class ChatThreadView(QScrollArea):
         self._thinking_raw_text = ""
         self._response_raw_text = ""
         self._response_started = False
+        # Unemitted tail of the last streamed chunk per kind (possible partial
+        # tag); thinking and response deltas interleave, so each keeps its own
+        self._sanitize_tails: Dict[str, str] = {"thinking": "", "response": ""}
 
         self._reduce_motion = prefers_reduced_motion_windows()
 
@@ -88,6 +136,12 @@ class ChatThreadView(QScrollArea):
 
         self.visible_range = (0, 0)
 
+        # Message widgets swapped out of the layout -> fixed-height stand-ins
+        self._virtual_placeholders: Dict[QWidget, QWidget] = {}
+
+        # Slot tops from the last full pass; None once the layout has moved
+        self._virtual_tops: Optional[List[int]] = None
+
         # ui
 
         self._setup_ui()
@@ -104,6 +158,34 @@ class ChatThreadView(QScrollArea):
 
         self.auto_scroll_timer.setSingleShot(True)
 
+        self._force_scroll = False
+
+        # Offscreen bubble check, debounced across scroll bursts
+
+        self._offscreen_timer = QTimer(self)
+
+        self._offscreen_timer.setSingleShot(True)
+
+        self._offscreen_timer.setInterval(150)
+
+        self._offscreen_timer.timeout.connect(self._update_offscreen_units)
+
+        self.verticalScrollBar().valueChanged.connect(self._offscreen_timer.start)
+
+        # Windowed virtualization, at most once per frame while scrolling
+
+        self._virtualization_timer = QTimer(self)
+
+        self._virtualization_timer.setSingleShot(True)
+
+        self._virtualization_timer.setInterval(16)
+
+        self._virtualization_timer.timeout.connect(self._update_virtualization)
+
+        self.verticalScrollBar().valueChanged.connect(self._virtualization_timer.start)
+
+        self.verticalScrollBar().rangeChanged.connect(self._invalidate_virtual_tops)
+
     def _setup_ui(self):
         """Setup the scroll area and content widget"""
 
@@ -126,6 +208,17 @@ class ChatThreadView(QScrollArea):
 
         self.content_layout.setSpacing(12)
 
+        # Messages live in their own sublayout so appends never reindex
+        # around the trailing stretch
+
+        self._messages_layout = QVBoxLayout()
+
+        self._messages_layout.setContentsMargins(0, 0, 0, 0)
+
+        self._messages_layout.setSpacing(12)
+
+        self.content_layout.addLayout(self._messages_layout)
+
         self.content_layout.addStretch()  # Push messages to top initially
 
         self.setWidget(self.content_widget)
@@ -374,46 +467,57 @@ class ChatThreadView(QScrollArea):
 
         empty_widget = self._create_empty_state()
 
-        self.content_layout.addWidget(empty_widget)
-
-        self.content_layout.addStretch()
-
-    def _create_empty_state(self) -> QWidget:
-        """Create the empty state widget"""
-        from pathlib import Path
-
-        empty_frame = QFrame()
+        self._messages_layout.addWidget(empty_widget)
 
-        empty_layout = QVBoxLayout(empty_frame)
+    @classmethod
+    def _get_logo_pixmap(cls) -> QPixmap:
+        """Locate, load and scale the empty-state logo once per process.
 
-        empty_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        Returns a null QPixmap when no logo file is found.
+        """
+        if cls._cached_logo_pixmap is not None:
+            return cls._cached_logo_pixmap
 
-        empty_layout.setSpacing(16)
+        from pathlib import Path
 
-        # Logo image
-        logo_label = QLabel()
-        logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        
         # Find logo in Images folder
         base_dir = Path(__file__).parent.parent.parent.parent  # Up to App/
         logo_paths = [
             base_dir / "Images" / "sur5_logo.png",
             Path(r"C:\ProgramData\Sur5\Images\sur5_logo.png"),  # Installed location
         ]
-        
-        logo_loaded = False
+
+        cls._cached_logo_pixmap = QPixmap()
         for logo_path in logo_paths:
             if logo_path.exists():
                 pixmap = QPixmap(str(logo_path))
                 if not pixmap.isNull():
                     # Scale to reasonable size
-                    scaled = pixmap.scaled(80, 80, Qt.AspectRatioMode.KeepAspectRatio, 
-                                          Qt.TransformationMode.SmoothTransformation)
-                    logo_label.setPixmap(scaled)
-                    logo_loaded = True
+                    cls._cached_logo_pixmap = pixmap.scaled(
+                        80, 80, Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation
+                    )
                     break
+        return cls._cached_logo_pixmap
+
+    def _create_empty_state(self) -> QWidget:
+        """Create the empty state widget"""
+
+        empty_frame = QFrame()
+
+        empty_layout = QVBoxLayout(empty_frame)
+
+        empty_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        empty_layout.setSpacing(16)
+
+        # Logo image
+        logo_label = QLabel()
+        logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        if logo_loaded:
+        logo_pixmap = self._get_logo_pixmap()
+        if not logo_pixmap.isNull():
+            logo_label.setPixmap(logo_pixmap)
             empty_layout.addWidget(logo_label)
 
         # Welcome message
@@ -450,6 +554,10 @@ class ChatThreadView(QScrollArea):
 
         return empty_frame
 
+    def _append_history(self, message_data: Dict[str, Any]):
+        """Append a message to the history"""
+        self.messages.append(message_data)
+
     def add_message(self, message_data: Dict[str, Any]):
         """Add a message to the thread"""
         # Prevent duplicate echo
@@ -460,10 +568,9 @@ class ChatThreadView(QScrollArea):
         else:
             # Remove empty state on first message
             self._clear_layout()
-            self.content_layout.addStretch()
 
         # Add to message storage
-        self.messages.append(message_data)
+        self._append_history(message_data)
         
         # Create message widget using MessageUnit
         if message_data["role"] == "user":
@@ -504,28 +611,24 @@ class ChatThreadView(QScrollArea):
 
         # Add to layout
 
-        self.content_layout.insertWidget(
-            self.content_layout.count() - 1, message_widget)
+        self._messages_layout.addWidget(message_widget)
 
         self.message_widgets.append(message_widget)
 
         # Handle virtualization if needed
 
         if self.virtualization_enabled and len(
-                self.messages) > self.virtualization_threshold:
+                self.message_widgets) > self.virtualization_threshold:
 
-            self._update_virtualization()
+            self._virtualization_timer.start()
 
         # Auto-scroll to bottom (force scroll on new message)
-
-        self._schedule_scroll_to_bottom(force=True)
-        
-        # CRITICAL FIX: For user messages, ensure scroll reaches bottom after layout completes
-        # This fixes the issue where sending a follow-up message while scrolled up
-        # doesn't snap the view down to show the new message
+        # CRITICAL FIX: For user messages, re-check once layout has settled so
+        # sending a follow-up while scrolled up still snaps to the new message
         if message_data["role"] == "user":
-            QTimer.singleShot(50, lambda: self._schedule_scroll_to_bottom(force=True))
-            QTimer.singleShot(150, lambda: self._schedule_scroll_to_bottom(force=True))
+            self._scroll_after_settle(force=True)
+        else:
+            self._schedule_scroll_to_bottom(force=True)
 
     def _create_user_bubble(self, content: str, timestamp: float) -> QWidget:
         """Create a user message bubble"""
@@ -724,10 +827,7 @@ class ChatThreadView(QScrollArea):
             self.current_message_unit.set_theme_colors(self._theme_colors)
         
         # Add to layout immediately
-        self.content_layout.insertWidget(
-            self.content_layout.count() - 1,
-            self.current_message_unit
-        )
+        self._messages_layout.addWidget(self.current_message_unit)
         
         # Start streaming mode within MessageUnit
         self.current_message_unit.start_streaming_thinking()
@@ -736,6 +836,7 @@ class ChatThreadView(QScrollArea):
         self.is_streaming = True
         self._thinking_raw_text = ""
         self._response_raw_text = ""
+        self._reset_sanitize_tails()
         self._response_started = False
 
         self._schedule_scroll_to_bottom(force=True)
@@ -757,10 +858,7 @@ class ChatThreadView(QScrollArea):
             self.current_message_unit.set_theme_colors(self._theme_colors)
         
         # Add to layout immediately
-        self.content_layout.insertWidget(
-            self.content_layout.count() - 1,
-            self.current_message_unit
-        )
+        self._messages_layout.addWidget(self.current_message_unit)
         
         # Start direct response streaming (skip thinking/skeleton phases)
         self.current_message_unit.start_streaming_response()
@@ -770,27 +868,28 @@ class ChatThreadView(QScrollArea):
         self._response_started = True
         self._thinking_raw_text = ""
         self._response_raw_text = ""
+        self._reset_sanitize_tails()
         
         self._schedule_scroll_to_bottom(force=True)
 
-    def update_thinking_content(self, thinking_chunk: str):
-        """Forward thinking chunks to persistent MessageUnit"""
+    def update_thinking_content(self, chunk_data: Dict[str, Any]):
+        """Forward parsed thinking chunks to persistent MessageUnit"""
         if not self.current_message_unit:
             return
         
-        try:
-            chunk_data = json.loads(thinking_chunk)
-        except json.JSONDecodeError:
-            chunk_data = {"content": thinking_chunk, "close": False}
-        
         if chunk_data.get("close"):
             logger.debug("THINKING CLOSE: Transitioning to skeleton")
+            tail = self._flush_sanitize_tail("thinking")
+            if tail:
+                self.current_message_unit.update_thinking_stream(tail)
             # Transition MessageUnit to skeleton phase
             self.current_message_unit.transition_to_skeleton()
             self._response_started = True
             self._schedule_scroll_to_bottom()
         else:
-            clean_chunk = chunk_data.get("content", thinking_chunk)
+            clean_chunk = self._sanitize_delta("thinking", chunk_data.get("content", ""))
+            if not clean_chunk:
+                return
             # Forward to MessageUnit
             self.current_message_unit.update_thinking_stream(clean_chunk)
             # Smart auto-scroll: follows streaming if user is near bottom
@@ -846,25 +945,25 @@ class ChatThreadView(QScrollArea):
             # If header methods fail, still mark as setup
             thinking_frame.setProperty("collapsible_setup", True)
 
-    def update_streaming_response(self, response_chunk: str):
-        """Forward response chunks to persistent MessageUnit"""
+    def update_streaming_response(self, chunk_data: Dict[str, Any]):
+        """Forward parsed response chunks to persistent MessageUnit"""
         if not self.current_message_unit:
             return
         
-        try:
-            chunk_data = json.loads(response_chunk)
-        except json.JSONDecodeError:
-            chunk_data = {"content": response_chunk, "close": False}
-        
         if chunk_data.get("close"):
             logger.debug("RESPONSE CLOSE: Waiting for backend content")
+            tail = self._flush_sanitize_tail("response")
+            if tail:
+                self.current_message_unit.update_response_stream(tail)
             # DO NOT finalize here - wait for message_received with backend content
             # Show "Finalizing..." state while backend processes
             if self.current_message_unit:
                 self.current_message_unit.show_finalizing_state()
             self._response_started = False
         else:
-            clean_chunk = chunk_data.get("content", response_chunk)
+            clean_chunk = self._sanitize_delta("response", chunk_data.get("content", ""))
+            if not clean_chunk:
+                return
             # Forward to MessageUnit (buffered internally while skeleton shows)
             self.current_message_unit.update_response_stream(clean_chunk)
             # Smart auto-scroll during response phase
@@ -877,6 +976,9 @@ class ChatThreadView(QScrollArea):
             return
         
         logger.debug(f"finalize: think={len(thinking_content)} resp={len(response_content)}")
+
+        # Drop any held partial tags; the backend content below supersedes them
+        self._reset_sanitize_tails()
         
         # Validate content
         if not response_content or len(response_content.strip()) <= 5:
@@ -886,7 +988,7 @@ class ChatThreadView(QScrollArea):
         self.current_message_unit.finalize_streaming(thinking_content, response_content)
         
         # Add to message history
-        self.messages.append({
+        self._append_history({
             "role": "assistant",
             "content": response_content,
             "thinking": thinking_content,
@@ -896,11 +998,9 @@ class ChatThreadView(QScrollArea):
         # Keep reference briefly for skip logic, then clear
         QTimer.singleShot(500, self._clear_streaming_state)
         
-        self._schedule_scroll_to_bottom()
-        
-        # Schedule additional scroll after MessageUnit animations complete (fade-out 200ms + fade-in 200ms)
+        # Re-check after MessageUnit animations complete (fade-out 200ms + fade-in 200ms)
         # This ensures scroll reaches the actual expanded content height, not the skeleton height
-        QTimer.singleShot(500, self._schedule_scroll_to_bottom)
+        self._scroll_after_settle(settle_ms=500)
 
     def _clear_streaming_state(self):
         """Clear streaming state after finalization"""
@@ -918,7 +1018,7 @@ class ChatThreadView(QScrollArea):
 
         message_unit.timestamp = timestamp
         if hasattr(message_unit, "timestamp_label"):
-            time_str = time.strftime("%H:%M", time.localtime(timestamp))
+            time_str = _fmt_hhmm(int(timestamp) // 60)
             message_unit.timestamp_label.setText(time_str)
 
     def _remove_duplicate_response_widgets(self, final_content: str, timestamp: float):
@@ -942,13 +1042,15 @@ class ChatThreadView(QScrollArea):
                 to_remove.append(widget)
 
         for widget in to_remove:
-            if self.content_layout.indexOf(widget) != -1:
-                self.content_layout.removeWidget(widget)
+            self._materialize_widget(widget)
+            if self._messages_layout.indexOf(widget) != -1:
+                self._messages_layout.removeWidget(widget)
             widget.deleteLater()
             try:
                 self.message_widgets.remove(widget)
             except ValueError:
                 pass
+            self._virtual_tops = None
 
     def _finalize_streaming_message(self, message_data: Dict[str, Any]):
         """Finalize existing streaming widgets with final content"""
@@ -1019,19 +1121,19 @@ class ChatThreadView(QScrollArea):
         """Show an error message"""
         # Clean up persistent message unit if active
         if self.current_message_unit:
-            self.content_layout.removeWidget(self.current_message_unit)
+            self._messages_layout.removeWidget(self.current_message_unit)
             self.current_message_unit.deleteLater()
             self.current_message_unit = None
         
         # Clean up old temporary widgets (for backward compatibility)
         self._finish_processing_header()
         if self.current_thinking_widget:
-            self.content_layout.removeWidget(self.current_thinking_widget)
+            self._messages_layout.removeWidget(self.current_thinking_widget)
             self.current_thinking_widget.deleteLater()
             self.current_thinking_widget = None
             self.thinking_content_label = None
         if self.current_response_widget:
-            self.content_layout.removeWidget(self.current_response_widget)
+            self._messages_layout.removeWidget(self.current_response_widget)
             self.current_response_widget.deleteLater()
             self.current_response_widget = None
             self.response_content_label = None
@@ -1041,6 +1143,7 @@ class ChatThreadView(QScrollArea):
         self._response_started = False
         self._thinking_raw_text = ""
         self._response_raw_text = ""
+        self._reset_sanitize_tails()
 
         error_container = QWidget()
 
@@ -1070,8 +1173,7 @@ class ChatThreadView(QScrollArea):
 
         error_layout.addStretch()
 
-        self.content_layout.insertWidget(
-            self.content_layout.count() - 1, error_container)
+        self._messages_layout.addWidget(error_container)
 
         self._schedule_scroll_to_bottom()
 
@@ -1085,7 +1187,7 @@ class ChatThreadView(QScrollArea):
         
         # If this is a model status message, remove any previous model status
         if is_model_status and self.current_model_status_widget:
-            self.content_layout.removeWidget(self.current_model_status_widget)
+            self._messages_layout.removeWidget(self.current_model_status_widget)
             self.current_model_status_widget.deleteLater()
             self.current_model_status_widget = None
 
@@ -1107,8 +1209,10 @@ class ChatThreadView(QScrollArea):
         status_layout.addWidget(status_label)
 
         # Insert at top (position 0) for model status, at bottom for other messages
-        insert_position = 0 if is_model_status else (self.content_layout.count() - 1)
-        self.content_layout.insertWidget(insert_position, status_container)
+        if is_model_status:
+            self._messages_layout.insertWidget(0, status_container)
+        else:
+            self._messages_layout.addWidget(status_container)
         
         # Track model status widget
         if is_model_status:
@@ -1122,19 +1226,19 @@ class ChatThreadView(QScrollArea):
         """Clear all messages"""
         # Clean up persistent streaming widget if active
         if self.current_message_unit:
-            self.content_layout.removeWidget(self.current_message_unit)
+            self._messages_layout.removeWidget(self.current_message_unit)
             self.current_message_unit.deleteLater()
             self.current_message_unit = None
 
         # Clean up old temporary widgets (for backward compatibility)
         self._finish_processing_header()
         if self.current_thinking_widget:
-            self.content_layout.removeWidget(self.current_thinking_widget)
+            self._messages_layout.removeWidget(self.current_thinking_widget)
             self.current_thinking_widget.deleteLater()
             self.current_thinking_widget = None
         
         if self.current_response_widget:
-            self.content_layout.removeWidget(self.current_response_widget)
+            self._messages_layout.removeWidget(self.current_response_widget)
             self.current_response_widget.deleteLater()
             self.current_response_widget = None
 
@@ -1142,6 +1246,7 @@ class ChatThreadView(QScrollArea):
         self.is_streaming = False
         self._thinking_raw_text = ""
         self._response_raw_text = ""
+        self._reset_sanitize_tails()
 
         # Clear model status tracking (will be removed by _clear_layout anyway)
         self.current_model_status_widget = None
@@ -1150,20 +1255,36 @@ class ChatThreadView(QScrollArea):
 
         self.message_widgets.clear()
 
-        self._clear_layout()
+        self._search_original_text.clear()
+
+        # _show_empty_state clears the layout itself
 
         self._show_empty_state()
 
     def _clear_layout(self):
-        """Clear all widgets from the layout"""
+        """Clear all widgets from the messages layout"""
+
+        # Virtualized widgets are out of the layout; delete them explicitly
+        for widget in self._virtual_placeholders:
+
+            widget.deleteLater()
+
+        self._virtual_placeholders.clear()
+
+        self._virtual_tops = None
 
-        while self.content_layout.count():
+        # Drain from the tail; detaching each widget right away keeps later
+        # layout passes from visiting the dying ones
 
-            child = self.content_layout.takeAt(0)
+        for index in reversed(range(self._messages_layout.count())):
+
+            widget = self._messages_layout.takeAt(index).widget()
+
+            if widget:
 
-            if child.widget():
+                widget.setParent(None)
 
-                child.widget().deleteLater()
+                widget.deleteLater()
 
     def _schedule_scroll_to_bottom(self, force: bool = False):
         """Schedule auto-scroll to bottom
@@ -1171,9 +1292,28 @@ class ChatThreadView(QScrollArea):
         Args:
             force: If True, force scroll to bottom regardless of user position
         """
-        self._force_scroll = force
-        # Use 0ms to defer to next event loop when Qt has updated the layout
-        self.auto_scroll_timer.start(0)
+        # Accumulate: a forced request must survive later unforced ones
+        self._force_scroll = self._force_scroll or force
+        # Use 0ms to defer to next event loop when Qt has updated the layout;
+        # one pending scroll per event loop turn is enough
+        if not self.auto_scroll_timer.isActive():
+            self.auto_scroll_timer.start(0)
+
+    def _scroll_after_settle(self, force: bool = False, settle_ms: int = 120):
+        """Scroll on the next event loop tick, then verify once after layout settles
+
+        Args:
+            force: If True, force scroll to bottom regardless of user position
+            settle_ms: Delay before the single follow-up check
+        """
+        self._schedule_scroll_to_bottom(force=force)
+        QTimer.singleShot(settle_ms, lambda: self._verify_scrolled_to_bottom(force))
+
+    def _verify_scrolled_to_bottom(self, force: bool):
+        """Follow-up for _scroll_after_settle; only rescrolls if the bottom moved"""
+        scrollbar = self.verticalScrollBar()
+        if scrollbar.value() < scrollbar.maximum():
+            self._schedule_scroll_to_bottom(force=force)
 
     def _scroll_to_bottom(self):
         """Smart auto-scroll: only scroll if user is near the bottom
@@ -1188,7 +1328,7 @@ class ChatThreadView(QScrollArea):
         maximum_value = scrollbar.maximum()
         
         # Check if force scroll is requested
-        force_scroll = getattr(self, '_force_scroll', False)
+        force_scroll = self._force_scroll
         
         # Define "near bottom" threshold (100px tolerance)
         # If user is within 100px of bottom, continue auto-scrolling
@@ -1211,30 +1351,141 @@ class ChatThreadView(QScrollArea):
         self._force_scroll = False
 
     def _update_virtualization(self):
-        """Update virtualization if enabled"""
+        """Keep only message widgets near the viewport in the layout
+
+        Widgets more than a page above or below the viewport are swapped for
+        empty placeholders of the same height, so scrolling and relayout cost
+        scales with what is on screen instead of the whole history.
+        """
 
         if not self.virtualization_enabled:
 
             return
 
-        # For now, simple implementation - could be enhanced with more
-        # sophisticated virtualization
+        widgets = self.message_widgets
+
+        if len(widgets) <= self.virtualization_threshold:
+
+            for widget in list(self._virtual_placeholders):
+
+                self._materialize_widget(widget)
+
+            self._virtual_tops = None
+
+            return
+
+        top = self.verticalScrollBar().value()
+
+        height = self.viewport().height()
+
+        lower, upper = top - height, top + 2 * height
+
+        # Slot tops are ascending in layout order, so the window is a bisect.
+        # Placeholders keep slot heights, so the tops only need re-reading
+        # after the scroll range (i.e. the layout) changes.
+        tops = self._virtual_tops
+
+        full_pass = tops is None or len(tops) != len(widgets)
+
+        if full_pass:
+
+            tops = [
+                self._virtual_placeholders.get(widget, widget).geometry().top()
+                for widget in widgets
+            ]
+
+            self._virtual_tops = tops
+
+        first = max(bisect_right(tops, lower) - 1, 0)
+
+        last = bisect_right(tops, upper)
+
+        if full_pass:
+
+            candidates = range(len(widgets))
+
+        else:
+
+            # Only rows entering or leaving the window can change state
+            prev_first, prev_last = self.visible_range
+
+            candidates = range(min(first, prev_first), max(last, prev_last))
+
+        self.visible_range = (first, last)
+
+        for index in candidates:
+
+            if first <= index < last:
+
+                self._materialize_widget(widgets[index])
+
+            else:
+
+                self._dematerialize_widget(widgets[index])
+
+    def _invalidate_virtual_tops(self, _minimum: int = 0, _maximum: int = 0):
+        """Force a full virtualization pass after content height changes"""
+
+        self._virtual_tops = None
+
+        if self.virtualization_enabled and len(self.message_widgets) > self.virtualization_threshold:
+
+            self._virtualization_timer.start()
+
+    def _dematerialize_widget(self, widget: QWidget):
+        """Swap a message widget out of the layout for a same-height placeholder"""
+
+        if widget in self._virtual_placeholders or self._messages_layout.indexOf(widget) == -1:
+
+            return
+
+        placeholder = QWidget()
+
+        placeholder.setFixedHeight(widget.height())
+
+        self._messages_layout.replaceWidget(widget, placeholder)
+
+        widget.hide()
+
+        self._virtual_placeholders[widget] = placeholder
+
+    def _materialize_widget(self, widget: QWidget):
+        """Put a virtualized message widget back in place of its placeholder"""
+
+        placeholder = self._virtual_placeholders.pop(widget, None)
+
+        if placeholder is None:
+
+            return
+
+        self._messages_layout.replaceWidget(placeholder, widget)
+
+        widget.show()
+
+        placeholder.deleteLater()
+
+    def _update_offscreen_units(self):
+        """Tell each MessageUnit whether it is outside the viewport (plus one screen of margin)"""
 
-        total_messages = len(self.messages)
+        top = self.verticalScrollBar().value()
 
-        if total_messages > self.virtualization_threshold:
+        height = self.viewport().height()
 
-            # Keep last N messages visible
+        lower, upper = top - height, top + 2 * height
 
-            visible_count = min(self.virtualization_threshold, total_messages)
+        for widget in self.message_widgets:
 
-            start_idx = total_messages - visible_count
+            if isinstance(widget, MessageUnit):
 
-            # This is a simplified approach - real virtualization would be more
-            # complex
+                if widget in self._virtual_placeholders:
 
-            logger.debug(
-                f"Virtualization: Showing {visible_count} of {total_messages} messages")
+                    widget.set_offscreen(True)
+
+                    continue
+
+                geometry = widget.geometry()
+
+                widget.set_offscreen(geometry.bottom() < lower or geometry.top() > upper)
 
     def _create_fallback_message_widget(
             self, message_data: Dict[str, Any]) -> QWidget:
@@ -1294,23 +1545,27 @@ class ChatThreadView(QScrollArea):
 
         message_widget = self.message_widgets[message_index]
 
-        # Find all QLabel widgets in the message
+        self._materialize_widget(message_widget)
 
-        labels = message_widget.findChildren(QLabel)
+        # All QLabel widgets in the message (cached on MessageUnit)
 
-        for label in labels:
+        if isinstance(message_widget, MessageUnit):
 
-            # CRITICAL FIX: Always get clean plain text first
+            labels = message_widget.labels()
+
+        else:
+
+            labels = message_widget.findChildren(QLabel)
 
-            # Store original text if not already stored
+        for label in labels:
 
-            if not hasattr(label, '_original_text'):
+            # CRITICAL FIX: Always get clean plain text first
 
-                label._original_text = label.text()
+            # Store original text if not already stored, then use it (not the
 
-            # Use stored original text (not the potentially HTML-escaped text)
+            # potentially HTML-escaped text)
 
-            original_text = label._original_text
+            original_text = self._search_original_text.setdefault(label, label.text())
 
             if not original_text or not search_term:
 
@@ -1330,26 +1585,30 @@ class ChatThreadView(QScrollArea):
 
                 label.setTextFormat(Qt.TextFormat.RichText)
 
-        # Scroll to the message
+        # Scroll once the RichText relayout has settled, not against stale geometry
 
-        self.ensureWidgetVisible(message_widget)
+        QTimer.singleShot(0, lambda mw=message_widget: self.ensureWidgetVisible(mw))
 
     def clear_search_highlights(self):
         """Remove all search highlighting from messages"""
 
-        for message_widget in self.message_widgets:
+        # Only labels a highlight pass touched need restoring
 
-            labels = message_widget.findChildren(QLabel)
+        for label, original_text in self._search_original_text.items():
+
+            # CRITICAL FIX: Restore original plain text
+
+            try:
 
-            for label in labels:
+                label.setText(original_text)
 
-                # CRITICAL FIX: Restore original plain text
+                label.setTextFormat(Qt.TextFormat.PlainText)
 
-                if hasattr(label, '_original_text'):
+            except RuntimeError:
 
-                    label.setText(label._original_text)
+                pass  # Bubble was deleted since it was highlighted
 
-                    label.setTextFormat(Qt.TextFormat.PlainText)
+        self._search_original_text.clear()
 
     def scroll_to_message(self, message_index: int):
         """Scroll to a specific message"""
@@ -1360,6 +1619,8 @@ class ChatThreadView(QScrollArea):
 
         message_widget = self.message_widgets[message_index]
 
+        self._materialize_widget(message_widget)
+
         self.ensureWidgetVisible(message_widget)
 
     def _create_highlighted_html(
@@ -1385,47 +1646,23 @@ class ChatThreadView(QScrollArea):
 
         """
 
-        import html
-
-        import re
-
         # CRITICAL FIX: Escape the entire text ONCE at the start
 
         escaped_text = html.escape(text)
 
-        # Define highlight colors
-
-        if is_current:
-
-            bg_color = "#ff9800"  # Orange for current result
-
-            text_color = "#000000"  # Black text
-
-        else:
-
-            bg_color = "#ffeb3b"  # Yellow for other results
-
-            text_color = "#000000"  # Black text
-
-        # Case-insensitive search and replace
-
-        # Escape the search term for regex
-
-        escaped_search_term = re.escape(html.escape(search_term))
-
-        pattern = re.compile(escaped_search_term, re.IGNORECASE)
+        # Orange for current result, yellow for the others
 
-        # Replace matches with highlighted spans
+        span_open = _HIGHLIGHT_SPAN_CURRENT if is_current else _HIGHLIGHT_SPAN_OTHER
 
-        def replace_match(match: Match) -> str:
+        # Case-insensitive search and replace with a per-term cached pattern
 
-            matched_text = match.group()
+        return _search_pattern(search_term).sub(
 
-            return f'<span style="background-color: {bg_color}; color: {text_color}; padding: 2px 4px; border-radius: 3px; font-weight: bold;">{matched_text}</span>'
+            lambda match: span_open + match.group() + _HIGHLIGHT_SPAN_CLOSE,
 
-        highlighted = pattern.sub(replace_match, escaped_text)
+            escaped_text
 
-        return highlighted
+        )
 
     def _sanitize_stream_chunk(self, chunk: str, *, is_thinking: bool) -> str:
         """Normalize streaming chunk text by stripping tags, placeholders, and control chars."""
@@ -1488,6 +1725,38 @@ class ChatThreadView(QScrollArea):
         cleaned = re.sub(r"\s+", lambda m: "\n" if "\n" in m.group(0) else " ", cleaned)
         return cleaned
 
+    def _sanitize_delta(self, kind: str, chunk: str) -> str:
+        """Strip sentinel tags from a streamed delta without rescanning the buffer.
+
+        <think>, <thinking> and <final_answer> tags are removed from the live
+        stream. A trailing ``<...`` run that could still grow into one of them
+        is held back and prepended to the next chunk of the same kind (or
+        flushed on close), so tags split across chunks are caught.
+        """
+        held = self._sanitize_tails[kind]
+        text = held + chunk if held else chunk
+        self._sanitize_tails[kind] = ""
+        if "<" not in text:
+            return text
+
+        cut = text.rfind("<")
+        tail = text[cut:]
+        if ">" not in tail and len(tail) <= _SANITIZE_TAIL_LEN and _may_grow_into_sentinel(tail):
+            self._sanitize_tails[kind] = tail
+            text = text[:cut]
+        return _TAG_KILL.sub("", text)
+
+    def _flush_sanitize_tail(self, kind: str) -> str:
+        """Return whatever _sanitize_delta held back for kind, cleaned, and reset it."""
+        tail = self._sanitize_tails[kind]
+        self._sanitize_tails[kind] = ""
+        return _TAG_KILL.sub("", tail) if tail else ""
+
+    def _reset_sanitize_tails(self):
+        """Forget held partial tags for both streams"""
+        self._sanitize_tails["thinking"] = ""
+        self._sanitize_tails["response"] = ""
+
     def _sanitize_final_text(self, text: str, *, is_thinking: bool) -> str:
         """Sanitize fully generated text before rendering in the UI."""
         if not text:
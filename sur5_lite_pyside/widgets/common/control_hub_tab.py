@@ -5,7 +5,7 @@ Vertical tab widget for toggling sidebar visibility
 """
 
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, Signal, QRect
+from PySide6.QtCore import Qt, Signal, QRect, QEvent
 from PySide6.QtGui import QPainter, QColor, QFont, QPen, QFontMetrics
 
 
@@ -14,6 +14,10 @@ class ControlHubTab(QWidget):
     
     # Signals
     clicked = Signal()
+
+    _LABEL_TEXT = "CONTROL HUB"
+    # white for visibility on danger background
+    _LABEL_PEN = QPen(QColor(255, 255, 255))
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -45,6 +49,24 @@ class ControlHubTab(QWidget):
         
         # Set cursor
         self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        # Label font and metrics, rebuilt only when the widget font changes
+        self._update_label_metrics()
+
+    def _update_label_metrics(self):
+        """Cache the bold 9pt label font and its text extents"""
+        self._label_font = QFont(self.font())
+        self._label_font.setPointSize(9)
+        self._label_font.setBold(True)
+        fm = QFontMetrics(self._label_font)
+        self._label_width = fm.horizontalAdvance(self._LABEL_TEXT)
+        self._label_height = fm.height()
+
+    def changeEvent(self, event):
+        """Refresh cached label metrics when font or style changes"""
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.StyleChange):
+            self._update_label_metrics()
+        super().changeEvent(event)
         
     def paintEvent(self, event):
         """Custom paint for vertical text"""
@@ -55,16 +77,10 @@ class ControlHubTab(QWidget):
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
         # Set font
-        font = QFont(self.font())
-        font.setPointSize(9)
-        font.setBold(True)
-        painter.setFont(font)
-        
-        # Set text color (white for visibility on danger background)
-        painter.setPen(QPen(QColor(255, 255, 255)))
+        painter.setFont(self._label_font)
         
-        # Draw vertical text
-        text = "CONTROL HUB"
+        # Set text color
+        painter.setPen(self._LABEL_PEN)
         
         # Save painter state
         painter.save()
@@ -73,16 +89,11 @@ class ControlHubTab(QWidget):
         painter.translate(self.width() / 2, self.height() / 2)
         painter.rotate(-90)
         
-        # Get text metrics for centering
-        fm = QFontMetrics(font)
-        text_width = fm.horizontalAdvance(text)
-        text_height = fm.height()
-        
-        # Draw text centered
+        # Draw vertical text centered (metrics cached in _update_label_metrics)
         painter.drawText(
-            -text_width / 2,
-            text_height / 4,
-            text
+            -self._label_width / 2,
+            self._label_height / 4,
+            self._LABEL_TEXT
         )
         
         painter.restore()